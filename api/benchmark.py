@@ -0,0 +1,180 @@
+"""
+Taillard benchmark runner for every solver / QUBO formulation.
+
+    python -m api.benchmark --family 20x5 --timeout 10 --seeds 0 1 2 \
+        --sampler local --csv results.csv --json results.json
+
+Each (instance, solver, seed) case runs in a fresh worker process so that
+peak RSS is per case. Recorded per case: QUBO build time (cold cache),
+solve time, decode time (decode, repair and scoring of the sample),
+tracemalloc peak, peak RSS, makespan and the relative percentage deviation
+(RPD) from the best known upper bound. QUBO solvers also report whether the
+chosen sample was a feasible permutation, its makespan before polishing,
+its energy rank among all samples and the share of feasible samples.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import platform
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .qubo_implementations.qubo_cache import instance_key, qubo_cache
+from .qubo_implementations.registry import formulations
+from .solve_qubo import JobMatrixModel, SolverParams, solve
+from .taillard import instance_names, taillard_family, taillard_instance, upper_bound
+
+__all__ = ['SOLVERS', 'run_case', 'run_benchmark']
+
+# solver name (as registered, see registry) -> (SolverParams overrides, qubo cache key)
+SOLVERS = {
+    "classical": ({"solver_type": "classical"}, None),
+    "exact": ({"solver_type": "exact"}, None),
+    "qbsolv": ({"solver_type": "qbsolv"}, "auto"),
+    "infinityq:position-based": ({"solver_type": "infinityq", "qubo_type": "position-based"}, "position-based"),
+    "infinityq:mocellin": ({"solver_type": "infinityq", "qubo_type": "mocellin"}, "mocellin"),
+    "infinityq:widmer-hertz": ({"solver_type": "infinityq", "qubo_type": "widmer-hertz"}, "widmer-hertz"),
+    "infinityq:gupta": ({"solver_type": "infinityq", "qubo_type": "gupta"}, "gupta"),
+    "infinityq:stinson-smith-1": ({"solver_type": "infinityq", "qubo_type": "stinson-smith-1"}, "stinson-smith-1"),
+    "infinityq:stinson-smith-2": ({"solver_type": "infinityq", "qubo_type": "stinson-smith-2"}, "stinson-smith-2"),
+    "infinityq:auto": ({"solver_type": "infinityq", "qubo_type": "auto"}, "auto"),
+}
+
+FIELDS = [
+    "instance", "jobs", "machines", "solver", "seed", "timeout", "status", "error",
+    "makespan", "upper_bound", "rpd", "lower_bound", "optimality_gap", "feasible", "sample_makespan", "energy_rank", "feasible_rate", "build_time", "solve_time", "decode_time",
+    "total_time", "tracemalloc_peak", "peak_rss",
+]
+
+def _peak_rss() -> int:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+def run_case(instance: str, solver: str, seed: int, timeout: float,
+             extra_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Solve one Taillard instance with one solver and return a result row.
+    Failures (e.g. a backend that is not installed) are recorded, not raised.
+    """
+    overrides, cache_key = SOLVERS[solver]
+    p = taillard_instance(instance)
+    n, m = p.shape
+    ub = upper_bound(instance)
+    row = {field: None for field in FIELDS}
+    row.update(instance=instance, jobs=n, machines=m, solver=solver, seed=seed,
+               timeout=timeout, upper_bound=ub)
+
+    random.seed(seed)
+    np.random.seed(seed)
+    params = SolverParams(timeout=timeout, seed=seed, **overrides, **(extra_params or {}))
+    job_matrix = JobMatrixModel(jobs=n, machines=m, processing_times=p.tolist())
+    pik = job_matrix.processing_times
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    try:
+        if cache_key is not None:
+            # The formulation module (with its build_qubo) is only imported for this case
+            module = formulations()[solver].load_module()
+            # Build on a cold cache; the solver then picks up the cached QUBO
+            qubo_cache.clear()
+            build_start = time.perf_counter()
+            qubo_cache.get_or_build(instance_key(pik, cache_key), lambda: module.build_qubo(pik, n, m))
+            row["build_time"] = time.perf_counter() - build_start
+
+        solve_start = time.perf_counter()
+        # titanq prints its banner and upload progress to stdout; keep it clean for the CSV output
+        with contextlib.redirect_stdout(sys.stderr):
+            result = solve(job_matrix, params)
+        row["solve_time"] = time.perf_counter() - solve_start
+
+        phases = result.get("timings", {}).get("phases", {})
+        if "decode" in phases:
+            row["decode_time"] = sum(phases.get(name, 0.0) for name in ("decode", "repair", "makespan"))
+
+        makespan = float(result["makespan"])
+        row.update(status="ok", makespan=makespan, rpd=100.0 * (makespan - ub) / ub,
+                   **{key: result.get(key) for key in ("lower_bound", "optimality_gap", "feasible", "sample_makespan",
+                                                       "energy_rank", "feasible_rate")})
+    except Exception as e:
+        row.update(status="error", error=str(getattr(e, "detail", e)))
+    row["total_time"] = time.perf_counter() - start_time
+    row["tracemalloc_peak"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    row["peak_rss"] = _peak_rss()
+    return row
+
+def run_benchmark(instances: List[str], solvers: List[str], seeds: List[int], timeout: float,
+                  extra_params: Optional[Dict[str, Any]] = None, isolate: bool = True) -> List[Dict[str, Any]]:
+    rows = []
+    for instance in instances:
+        for solver in solvers:
+            for seed in seeds:
+                if isolate:
+                    with ProcessPoolExecutor(max_workers=1) as pool:
+                        row = pool.submit(run_case, instance, solver, seed, timeout, extra_params).result()
+                else:
+                    row = run_case(instance, solver, seed, timeout, extra_params)
+                print(f"{instance} {solver} seed={seed}: {row['status']} makespan={row['makespan']} "
+                      f"rpd={row['rpd']} total={row['total_time']:.2f}s", file=sys.stderr)
+                rows.append(row)
+    return rows
+
+def _metadata(args) -> Dict[str, Any]:
+    import scipy
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "platform": platform.platform(),
+        "args": vars(args),
+    }
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the flow shop solvers on Taillard instances")
+    parser.add_argument("--instances", nargs="*", default=[], help="e.g. ta001 ta002")
+    parser.add_argument("--family", nargs="*", default=[], help="e.g. 20x5 50x10")
+    parser.add_argument("--solvers", nargs="*", default=list(SOLVERS), choices=list(SOLVERS))
+    parser.add_argument("--seeds", nargs="*", type=int, default=[0])
+    parser.add_argument("--timeout", type=float, default=10.0, help="time budget per case in seconds")
+    parser.add_argument("--sampler", default=None, help="sampler for the infinityq formulations (titanq, local)")
+    parser.add_argument("--in-process", action="store_true", help="run all cases in this process")
+    parser.add_argument("--csv", help="write rows as CSV to this path ('-' for stdout)")
+    parser.add_argument("--json", help="write rows and run metadata as JSON to this path")
+    args = parser.parse_args(argv)
+
+    instances = list(args.instances)
+    for family in args.family:
+        instances += taillard_family(family)
+    instances = instances or ["ta001"]
+    unknown = [name for name in instances if name not in instance_names()]
+    if unknown:
+        parser.error(f"unknown instances: {', '.join(unknown)}")
+
+    extra_params = {"sampler": args.sampler} if args.sampler else None
+    rows = run_benchmark(instances, args.solvers, args.seeds, args.timeout, extra_params,
+                         isolate=not args.in_process)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"metadata": _metadata(args), "results": rows}, f, indent=2)
+    if args.csv or not args.json:
+        out = sys.stdout if args.csv in (None, "-") else open(args.csv, "w", newline="")
+        writer = csv.DictWriter(out, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import os
+import time
+import uuid
+import threading
+import multiprocessing as mp
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+__all__ = ['JobError', 'QueueFullError', 'JobManager']
+
+class JobError(Exception):
+    """Failure raised inside a worker process, reduced to a picklable message."""
+
+class QueueFullError(Exception):
+    """Raised on submit when the pending-job limit is reached."""
+
+    def __init__(self, pending: int, limit: int, retry_after: int):
+        super().__init__(f"Job queue is full ({pending}/{limit} pending)")
+        self.pending = pending
+        self.limit = limit
+        self.retry_after = retry_after
+
+def _call(fn: Callable, args: tuple) -> Any:
+    # Exceptions such as fastapi.HTTPException do not survive pickling back
+    # from the worker, so only their message is sent to the parent.
+    try:
+        return fn(*args)
+    except Exception as e:
+        raise JobError(str(getattr(e, "detail", e))) from None
+
+class JobManager:
+    """
+    Bounded process pool for solver jobs:
+      - at most `max_pending` jobs are queued or running, batch tasks
+        included; further submissions raise QueueFullError so the API can
+        answer with backpressure
+      - finished jobs are kept for `result_ttl` seconds for polling
+    The pool is created on first use so importing the app never forks.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 result_ttl: float = 3600.0):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.max_workers
+        self.result_ttl = result_ttl
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        # Batch tasks on the pool; they count against max_pending like jobs
+        self._batch_futures: Set[Future] = set()
+        self._lock = threading.Lock()
+        # Notified whenever a job or batch task finishes and frees a slot
+        self._freed = threading.Condition(self._lock)
+
+    @classmethod
+    def from_env(cls) -> "JobManager":
+        workers = os.environ.get("SOLVER_WORKERS")
+        pending = os.environ.get("SOLVER_MAX_PENDING")
+        return cls(
+            max_workers=int(workers) if workers else None,
+            max_pending=int(pending) if pending else None,
+            result_ttl=float(os.environ.get("JOB_RESULT_TTL", 3600.0)),
+        )
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=mp.get_context())
+        return self._pool
+
+    def _submit(self, fn: Callable, args: tuple) -> Future:
+        # A worker that died (OOM kill, segfault in a native solver) breaks
+        # the whole pool; its jobs fail with BrokenProcessPool, and the pool
+        # is replaced so later submissions still run. Called with the lock held.
+        try:
+            return self._executor().submit(_call, fn, args)
+        except BrokenProcessPool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            return self._executor().submit(_call, fn, args)
+
+    def _pending(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job["future"].done()) + len(self._batch_futures)
+
+    def _check_capacity(self):
+        # Caller holds the lock
+        self._prune()
+        pending = self._pending()
+        if pending >= self.max_pending:
+            # Rough wait until a slot frees up: one round of the running jobs
+            retry_after = max(1, pending // self.max_workers)
+            raise QueueFullError(pending, self.max_pending, retry_after)
+
+    def _prune(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["finished_at"] is not None and now - job["finished_at"] > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, fn: Callable, *args, on_done: Optional[Callable[[Any, Optional[BaseException]], None]] = None) -> str:
+        """
+        Queue fn(*args) on the pool and return the new job id.
+        fn and args must be picklable (module-level function, plain data).
+        on_done(result, error) is called in this process when the job
+        finishes (not when it is cancelled).
+        """
+        with self._lock:
+            self._check_capacity()
+            job_id = uuid.uuid4().hex
+            future = self._submit(fn, args)
+            self._jobs[job_id] = {"future": future, "submitted_at": time.time(), "finished_at": None}
+        future.add_done_callback(lambda f, job_id=job_id: self._finished(job_id, f, on_done))
+        return job_id
+
+    def _finished(self, job_id: str, future: Future, on_done=None):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id]["finished_at"] = time.time()
+            self._freed.notify_all()
+        if on_done is not None and not future.cancelled():
+            error = future.exception()
+            on_done(None if error is not None else future.result(), error)
+
+    def _get(self, job_id: str) -> Dict[str, Any]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+    @staticmethod
+    def _state(future: Future) -> str:
+        if future.cancelled():
+            return "cancelled"
+        if future.done():
+            return "failed" if future.exception() is not None else "done"
+        return "running" if future.running() else "queued"
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        """
+        Public job record; raises KeyError for unknown or expired jobs.
+        """
+        job = self._get(job_id)
+        future = job["future"]
+        info = {
+            "job_id": job_id,
+            "status": self._state(future),
+            "submitted_at": job["submitted_at"],
+            "finished_at": job["finished_at"],
+        }
+        if info["status"] == "failed":
+            info["error"] = str(future.exception())
+        return info
+
+    def result(self, job_id: str) -> Any:
+        """
+        Result of a finished job. Raises KeyError for unknown jobs and
+        re-raises the worker's JobError for failed ones.
+        """
+        return self._get(job_id)["future"].result(timeout=0)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job that has not started yet.
+        """
+        return self._get(job_id)["future"].cancel()
+
+    def map_unordered(self, fn: Callable, arg_list: Iterable[tuple],
+                      window: Optional[int] = None) -> Iterator[Tuple[int, Any, Optional[str]]]:
+        """
+        Run fn(*args) for every args tuple on the pool and yield
+        (index, result, error) as each one completes, error being None on
+        success. At most `window` tasks (default 2 x workers) are in flight,
+        and only while the pending-job limit allows: batch tasks share
+        max_pending with submitted jobs. Raises QueueFullError right away
+        (not on first iteration) when no slot is free. Tasks not yet
+        started are cancelled if the consumer stops early.
+        """
+        with self._lock:
+            self._check_capacity()
+        return self._map(fn, iter(enumerate(arg_list)), window or 2 * self.max_workers)
+
+    def _batch_done(self, future: Future):
+        with self._lock:
+            self._batch_futures.discard(future)
+            self._freed.notify_all()
+
+    def _map(self, fn: Callable, todo: Iterator[Tuple[int, tuple]],
+             window: int) -> Iterator[Tuple[int, Any, Optional[str]]]:
+        in_flight: Dict[Future, int] = {}
+        waiting: Optional[Tuple[int, tuple]] = None
+
+        def fill():
+            nonlocal waiting
+            submitted = []
+            with self._lock:
+                while len(in_flight) < window:
+                    if waiting is None:
+                        waiting = next(todo, None)
+                        if waiting is None:
+                            break
+                    if self._pending() >= self.max_pending:
+                        # Every slot is taken; with nothing of ours running, wait for one to free up
+                        if in_flight:
+                            break
+                        self._freed.wait(timeout=1.0)
+                        continue
+                    index, args = waiting
+                    waiting = None
+                    future = self._submit(fn, args)
+                    self._batch_futures.add(future)
+                    in_flight[future] = index
+                    submitted.append(future)
+            # Outside the lock: the callback runs at once if the task already finished
+            for future in submitted:
+                future.add_done_callback(self._batch_done)
+
+        fill()
+        try:
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = in_flight.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        yield index, future.result(), None
+                    else:
+                        yield index, None, str(error)
+                fill()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            states = [self._state(job["future"]) for job in self._jobs.values()]
+            batch_tasks = len(self._batch_futures)
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "queued": states.count("queued"),
+            "running": states.count("running"),
+            "batch_tasks": batch_tasks,
+            "finished": len(states) - states.count("queued") - states.count("running"),
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
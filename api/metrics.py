@@ -0,0 +1,133 @@
+import bisect
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+__all__ = ['Counter', 'Histogram', 'MetricsRegistry', 'metrics', 'observe_solve', 'observe_failure', 'observe_cached']
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _format_labels(key: LabelKey, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != float("inf") else "+Inf"
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus text format.
+    """
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.buckets = sorted(buckets)
+        # label key -> (bucket counts, sum, count)
+        self._series: Dict[LabelKey, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_format_labels(key, [('le', _format_value(bound))])} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Solve pipeline metrics, aggregated in the API process. Results computed in
+# worker processes are recorded here from the "timings" they carry back.
+metrics = MetricsRegistry()
+
+_SECONDS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300]
+
+solve_requests = metrics.register(Counter(
+    "flowshop_solve_requests_total", "Solve requests by solver and outcome"))
+solve_seconds = metrics.register(Histogram(
+    "flowshop_solve_duration_seconds", "End-to-end solve time", _SECONDS))
+phase_seconds = metrics.register(Histogram(
+    "flowshop_solve_phase_seconds", "Time spent per solve pipeline phase", _SECONDS))
+problem_variables = metrics.register(Histogram(
+    "flowshop_problem_variables", "Binary variables of the solved QUBO",
+    [16, 64, 256, 1024, 4096, 16384, 65536, 262144]))
+problem_jobs = metrics.register(Histogram(
+    "flowshop_problem_jobs", "Jobs per solved instance", [5, 10, 20, 50, 100, 200, 500, 1000]))
+
+def observe_solve(solver: str, timings: Dict):
+    """
+    Record one successful solve from the "timings" section of its result.
+    """
+    solve_requests.inc(solver=solver, status="ok")
+    solve_seconds.observe(timings.get("total", 0.0), solver=solver)
+    for name, seconds in timings.get("phases", {}).items():
+        phase_seconds.observe(seconds, solver=solver, phase=name)
+    sizes = timings.get("sizes", {})
+    if "variables" in sizes:
+        problem_variables.observe(sizes["variables"], solver=solver)
+    if "jobs" in sizes:
+        problem_jobs.observe(sizes["jobs"], solver=solver)
+
+def observe_failure(solver: str):
+    solve_requests.inc(solver=solver, status="error")
+
+def observe_cached(solver: str, source: str = "hit"):
+    """
+    A request without a solve of its own: answered from the result cache
+    (source "hit", status "cached") or by waiting for an identical solve in
+    progress (source "coalesced", status "coalesced", whether that solve
+    succeeded or not; its outcome is counted once, for its owner).
+    """
+    solve_requests.inc(solver=solver, status="cached" if source == "hit" else "coalesced")
@@ -0,0 +1,101 @@
+import io
+import json
+import base64
+import binascii
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from fastapi.responses import Response
+
+__all__ = [
+    'PAYLOAD_DTYPES', 'NPZ_MEDIA_TYPE', 'json_default', 'processing_time_array', 'decode_base64_matrix',
+    'load_npy', 'encode_base64_matrix', 'wants_npz', 'npz_response',
+]
+
+# Element types accepted for base64 matrices (always little-endian)
+PAYLOAD_DTYPES = {"float32": "<f4", "float64": "<f8"}
+
+NPZ_MEDIA_TYPE = "application/x-npz"
+
+def json_default(value):
+    """
+    json.dumps default for the NumPy scalars and arrays solvers leave in
+    their results and events.
+    """
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def processing_time_array(value: Any, jobs: int, machines: int) -> np.ndarray:
+    """
+    The processing times as one C-contiguous read-only float64 (jobs,
+    machines) array. Every solver stage takes it with np.asarray, so the
+    matrix is converted once per request and then shared without copies.
+    """
+    try:
+        p = np.array(value, dtype=np.float64, order="C")
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"processing_times must be a numeric matrix: {e}")
+    if p.shape != (jobs, machines):
+        raise ValueError(f"processing_times has shape {p.shape}, expected ({jobs}, {machines})")
+    if not np.all(np.isfinite(p)) or np.any(p < 0):
+        raise ValueError("processing_times must be finite and non-negative")
+    p.setflags(write=False)
+    return p
+
+def decode_base64_matrix(data: str, shape: Tuple[int, int], dtype: str = "float32") -> np.ndarray:
+    """
+    Matrix of the given shape from base64 of its little-endian row-major
+    bytes (no copy beyond the base64 decode).
+    """
+    if dtype not in PAYLOAD_DTYPES:
+        raise ValueError(f"Unknown dtype '{dtype}', expected one of {list(PAYLOAD_DTYPES)}")
+    try:
+        raw = base64.b64decode(data, validate=True)
+    except binascii.Error as e:
+        raise ValueError(f"Invalid base64 payload: {e}")
+    item = np.dtype(PAYLOAD_DTYPES[dtype])
+    expected = shape[0] * shape[1] * item.itemsize
+    if len(raw) != expected:
+        raise ValueError(f"Payload has {len(raw)} bytes, expected {expected} for {shape} {dtype}")
+    return np.frombuffer(raw, dtype=item).reshape(shape)
+
+def encode_base64_matrix(matrix, dtype: str = "float32") -> str:
+    """
+    Inverse of decode_base64_matrix, for clients and tests.
+    """
+    return base64.b64encode(np.ascontiguousarray(matrix, dtype=PAYLOAD_DTYPES[dtype]).tobytes()).decode("ascii")
+
+def load_npy(content: bytes) -> np.ndarray:
+    """
+    2-D numeric matrix from the bytes of a .npy file (pickled objects are
+    refused).
+    """
+    try:
+        matrix = np.load(io.BytesIO(content), allow_pickle=False)
+    except (ValueError, OSError, EOFError) as e:
+        raise ValueError(f"Not a valid .npy file: {e}")
+    if not isinstance(matrix, np.ndarray) or matrix.ndim != 2 or matrix.dtype.kind not in "iuf":
+        raise ValueError("The .npy file must hold a 2-D numeric (jobs, machines) matrix")
+    return matrix
+
+def wants_npz(accept: Optional[str]) -> bool:
+    return accept is not None and NPZ_MEDIA_TYPE in accept
+
+def npz_response(result: Dict[str, Any]) -> Response:
+    """
+    Result as an .npz archive: "sequence" (int32, 1-based) and, for QUBO
+    solvers, the chosen sample "solution" (uint8) as arrays, and every
+    other field as UTF-8 JSON in "meta". Read it with
+    np.load(io.BytesIO(body)) and json.loads(archive["meta"].tobytes()).
+    """
+    arrays = {"sequence": np.asarray(result["sequence"], dtype=np.int32)}
+    if result.get("solution") is not None:
+        arrays["solution"] = np.asarray(result["solution"], dtype=np.uint8)
+    meta = {key: value for key, value in result.items() if key not in arrays}
+    arrays["meta"] = np.frombuffer(json.dumps(meta, default=json_default).encode(), dtype=np.uint8)
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return Response(content=buffer.getvalue(), media_type=NPZ_MEDIA_TYPE)
@@ -0,0 +1,75 @@
+from functools import lru_cache
+
+import numpy as np
+from scipy.sparse import coo_array, csr_array
+from typing import Tuple
+
+from .qubo import Qubo
+from .qubo_builder import adjacency_objective, assignment_constraints
+from .timing import phase
+
+__all__ = ['assignment_penalty_qubo', 'auto_qubo', 'verify_assignment_penalty']
+
+@lru_cache(maxsize=32)
+def assignment_penalty_qubo(n: int) -> Tuple[csr_array, int]:
+    """
+    Closed form of SamplingCompiler.generate_qubo(new_constraint, new_constraint, n**2)
+    for the permutation penalty
+      f(x) = sum_rows (sum x - 1)^2 + sum_cols (sum x - 1)^2
+    on the n x n assignment matrix (variable i*n + p).
+
+    Expanding with x^2 = x gives the constraint QUBO C (upper triangular):
+      C[a][a] = -2, C[a][b] = 2 for a < b in the same row or column,
+      offset 2n.
+    generate_qubo uses it both as cost and constraint with the "sum" penalty
+    weight w = sum(C > 0) - sum(C < 0) = 2n^3, so the result is
+    (1 + w) * C with offset 4n.
+    Cached per size (shared between instances); callers must not modify it.
+    """
+    size = n * n
+    scale = 1.0 + 2.0 * n**3
+    var = np.arange(size).reshape(n, n)
+
+    # Same row (job) pairs a < b, then same column (position) pairs a < b
+    first, second = np.triu_indices(n, k=1)
+    row_a, row_b = var[:, first].ravel(), var[:, second].ravel()
+    col_a, col_b = var[first, :].ravel(), var[second, :].ravel()
+
+    rows = np.concatenate([np.arange(size), row_a, col_a])
+    cols = np.concatenate([np.arange(size), row_b, col_b])
+    data = np.concatenate([
+        np.full(size, -2.0 * scale),
+        np.full(row_a.size + col_a.size, 2.0 * scale),
+    ])
+    Q = coo_array((data, (rows, cols)), shape=(size, size), dtype=np.float64).tocsr()
+    return Q, 4 * n
+
+def auto_qubo(pairwise_costs, n: int) -> Qubo:
+    """
+    Auto-formulation QUBO: the assignment penalty plus the pairwise costs on
+    the position-adjacency couplings (i*n + p, j*n + p + 1), i != j, with
+    the penalty's constant offset. The assignment constraints are attached
+    as well for samplers that enforce them directly.
+    """
+    with phase("qubo_assembly"):
+        Q, offset = assignment_penalty_qubo(n)
+        Q = Q + adjacency_objective(pairwise_costs, n, dtype=np.float64)
+        constraint_weights, constraint_bounds = assignment_constraints(n)
+    return Qubo.from_matrix(Q, offset=offset, constraint_weights=constraint_weights,
+                            constraint_bounds=constraint_bounds)
+
+def verify_assignment_penalty(n: int, constraint) -> None:
+    """
+    Opt-in check of the closed form against autoqubo's sampling compiler.
+    constraint: the black-box penalty function the symbolic path sampled.
+    Raises ValueError on any mismatch. This samples O(n^4) points and is only
+    meant for verification runs on small n.
+    """
+    from autoqubo import SamplingCompiler
+
+    expected, expected_offset = SamplingCompiler.generate_qubo(
+        lambda x: constraint(x), constraint, n**2
+    )
+    Q, offset = assignment_penalty_qubo(n)
+    if offset != expected_offset or not np.array_equal(Q.toarray(), np.asarray(expected, dtype=np.float64)):
+        raise ValueError(f"Closed-form assignment QUBO differs from SamplingCompiler output for n={n}")
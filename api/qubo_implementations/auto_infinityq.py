@@ -1,111 +1,63 @@
+import logging
 import numpy as np
 import time
-from autoqubo import SamplingCompiler, Utils
-from autoqubo.symbolic import symbolic_matrix, insert_values
 from fastapi import HTTPException
-from titanq import Model, Vtype, Target
+
+from .assignment_qubo import auto_qubo, verify_assignment_penalty
+from .distances import pairwise_cost_matrix
+from .qubo_cache import instance_key, qubo_cache
+from .repair import SAMPLE_FIELDS, postprocess
+from .timing import phase, record_size
+from .local_sampler import create_model, sampler_call
+from .warm_start import warm_start_kwargs, with_seeds
+
+logger = logging.getLogger(__name__)
 
 def solve_with_auto_infinityq(job_matrix, params):
     try:
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Extract parameters
         n = job_matrix.jobs
         m = job_matrix.machines
-        pik = np.array(job_matrix.processing_times)
-        
-        # Generate symbolic QUBO
-        symbolic_pik = symbolic_matrix(n, m, positive=True)
-        sym_qubo, offset = SamplingCompiler.generate_qubo(
-            lambda x: new_constraint(x), new_constraint, n**2
-        )
-        
-        # Compute costs and modify QUBO
-        pairwise_costs = compute_pairwise_costs(pik, n, m)
-        for i in range(n):
-            for j in range(n):
-                if i != j:
-                    for p in range(n-1):
-                        sym_qubo[i*n + p, j*n + (p+1)] += pairwise_costs[i, j]
+        pik = np.asarray(job_matrix.processing_times, dtype=np.float64)
         
-        # Get explicit QUBO
-        explicit_qubo = insert_values(sym_qubo, pik)
+        # Optionally check the closed-form penalty against autoqubo's sampler
+        if getattr(params, "verify_qubo", False):
+            verify_assignment_penalty(n, new_constraint)
+
+        # Build (or reuse) the explicit QUBO for this instance
+        qubo = qubo_cache.get_or_build(instance_key(pik, "auto"), lambda: build_qubo(pik, n, m))
+        record_size(variables=qubo.size, qubo_nnz=qubo.nnz, constraints=qubo.constraint_weights.shape[0])
         
         # Solve using InfinityQ
-        best_solution, energy = solve_with_infinityq(explicit_qubo, n, params)
-        solutions = [best_solution]
-        energies = [energy]
-        
-        # Get best solution
-        best_idx = np.argmin(energies)
-        best_solution = solutions[best_idx]
-        assignment_matrix = np.array(best_solution).reshape(n, n)
-        job_order = np.argmax(assignment_matrix, axis=0).tolist()
+        samples = solve_with_infinityq(qubo, pik, params)
         
-        # Calculate makespan
-        C = np.zeros((n, m))
-        for i in range(n):
-            for j in range(m):
-                if i == 0 and j == 0:
-                    C[i, j] = pik[job_order[i], j]
-                elif i == 0:
-                    C[i, j] = C[i, j-1] + pik[job_order[i], j]
-                elif j == 0:
-                    C[i, j] = C[i-1, j] + pik[job_order[i], j]
-                else:
-                    C[i, j] = max(C[i-1, j], C[i, j-1]) + pik[job_order[i], j]
+        # Every sample decoded and scored by makespan; the best schedule is polished
+        schedule = postprocess(samples, pik, params)
         
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
         
         return {
-            "makespan": float(C[n-1, m-1]),
-            "sequence": [j + 1 for j in job_order],  # Convert to 1-based indexing
-            "energy": float(energies[best_idx]),
+            "makespan": schedule["makespan"],
+            "sequence": [j + 1 for j in schedule["sequence"]],  # Convert to 1-based indexing
+            "energy": schedule["energy"],
             "execution_time": execution_time,
-            "num_occurrences": len(solutions),
-            "solution_quality": float(1.0 / (1.0 + abs(energies[best_idx])))
+            "num_occurrences": schedule["samples"],
+            "solution_quality": float(1.0 / (1.0 + abs(schedule["energy"]))),
+            **{key: schedule[key] for key in SAMPLE_FIELDS}
         }
     except Exception as e:
-        print(f"Error in solve_with_auto_infinityq: {str(e)}")
+        logger.error("Error in solve_with_auto_infinityq: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-def solve_with_infinityq(explicit_qubo, n, params):
-    # Convert QUBO to TitanQ format
-    N = explicit_qubo.shape[0]
-    bias = np.zeros(N, dtype=np.float32)
-    weights = np.zeros((N, N), dtype=np.float32)
-    
-    for i in range(N):
-        for j in range(i, N):
-            if i == j:
-                bias[i] = explicit_qubo[i, i]
-            else:
-                weights[i, j] = explicit_qubo[i, j]
-                weights[j, i] = explicit_qubo[i, j]
-    
-    # Setup TitanQ Model
-    model = Model(api_key="Your API Key")
-    x_vars = model.add_variable_vector(name="x_vars", size=n**2, vtype=Vtype.BINARY)
-    model.set_objective_matrices(weights, bias, target=Target.MINIMIZE)
-    
-    # Add constraints
-    constraint_weights = np.zeros((2 * n, n**2), dtype=np.float32)
-    constraint_bounds = np.zeros((2 * n, 2), dtype=np.float32)
-    tolerance = 1e-1
-    
-    # Job assignment constraints
-    for i in range(n):
-        for j in range(n):
-            constraint_weights[i, i * n + j] = 1
-        constraint_bounds[i] = [1 - tolerance, 1 + tolerance]
-    
-    # Position occupancy constraints
-    for j in range(n):
-        for i in range(n):
-            constraint_weights[n + j, i * n + j] = 1
-        constraint_bounds[n + j] = [1 - tolerance, 1 + tolerance]
-    
-    model.add_inequality_constraints_matrix(constraint_weights, constraint_bounds)
+def solve_with_infinityq(qubo, pik, params):
+    n, m = pik.shape
+    # The cached QUBO (with the assignment constraints) is loaded into the
+    # sampler model, TitanQ or the local parallel-tempering sampler; to_model
+    # converts it to their 1/2 x^T W x convention
+    with phase("sampler_setup"):
+        model = qubo.to_model(create_model(params), name="x_vars")
     
     # Set optimization parameters and solve
     beta = (1.0 / np.geomspace(params.T_min, params.T_max, params.num_chains)).tolist()
@@ -113,24 +65,29 @@ def solve_with_infinityq(explicit_qubo, n, params):
     # Get coupling multiplier parameter (default to 0.4 if not provided)
     coupling_multiplier = getattr(params, 'coupling_multiplier', 0.4)
     
-    results = model.optimize(
-        beta=beta,
-        timeout_in_secs=params.timeout,
-        num_engines=params.num_engines,
-        num_chains=params.num_chains,
-        coupling_mult=coupling_multiplier  # Add this line
-    )
-    
-    # Process results
-    lowest_energy = None
-    best_solution = None
-    
-    for energy, solution in results.result_items():
-        if lowest_energy is None or energy < lowest_energy:
-            lowest_energy = energy
-            best_solution = solution
+    # Optionally start the chains from NEH / known schedules
+    warm_start = warm_start_kwargs(model, pik, params)
+
+    # The sampler gets what is left of the request deadline after the build
+    with sampler_call(params, n, m) as timeout:
+        results = model.optimize(
+            beta=beta,
+            timeout_in_secs=timeout,
+            num_engines=params.num_engines,
+            num_chains=params.num_chains,
+            coupling_mult=coupling_multiplier,  # Add this line
+            **warm_start
+        )
     
-    return best_solution, lowest_energy
+    # (energy, vector) of every engine, plus any warm-start states
+    return with_seeds(results.result_items(), model, warm_start)
+
+def build_qubo(pik, n, m):
+    """Qubo of the auto-generated formulation"""
+    # Closed-form permutation penalty plus pairwise sequencing costs
+    with phase("distances"):
+        costs = compute_pairwise_costs(pik, n, m)
+    return auto_qubo(costs, n)
 
 # Constraint function for ensuring valid job assignments
 def new_constraint(x):
@@ -154,9 +111,4 @@ def compute_pairwise_costs(pik, n, m):
     For each adjacent pair in the sequence, the cost is the sum of absolute differences
     between job i's processing times on machines 2..m and job j's processing times on machines 1..m-1.
     """
-    dist = np.zeros((n, n))
-    for i in range(n):
-        for j in range(n):
-            if i != j:
-                dist[i, j] = np.sum(np.abs(pik[i, 1:m] - pik[j, :m-1]))
-    return dist
+    return pairwise_cost_matrix(pik)
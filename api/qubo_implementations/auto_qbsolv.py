@@ -1,72 +1,65 @@
+import logging
 import numpy as np
 import time
-from autoqubo import SamplingCompiler, Utils
-from autoqubo.symbolic import symbolic_matrix, insert_values
+from autoqubo import Utils
 from fastapi import HTTPException
 
+from .assignment_qubo import auto_qubo, verify_assignment_penalty
+from .distances import pairwise_cost_matrix
+from .qubo_cache import instance_key, qubo_cache
+from .repair import SAMPLE_FIELDS, postprocess
+from .local_sampler import sampler_call
+from .timing import phase, record_size
+
+logger = logging.getLogger(__name__)
+
 def solve_with_auto_qbsolv(job_matrix, params):
     try:
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Extract parameters
         n = job_matrix.jobs
         m = job_matrix.machines
-        pik = np.array(job_matrix.processing_times)
-        timeout = params.timeout  # Use timeout parameter (renamed from time_limit)
-        
-        # Generate symbolic QUBO
-        symbolic_pik = symbolic_matrix(n, m, positive=True)
-        sym_qubo, offset = SamplingCompiler.generate_qubo(
-            lambda x: new_constraint(x), new_constraint, n**2
-        )
-        
-        # Compute costs and modify QUBO
-        pairwise_costs = compute_pairwise_costs(pik, n, m)
-        for i in range(n):
-            for j in range(n):
-                if i != j:
-                    for p in range(n-1):
-                        sym_qubo[i*n + p, j*n + (p+1)] += pairwise_costs[i, j]
+        pik = np.asarray(job_matrix.processing_times, dtype=np.float64)
         
-        # Get explicit QUBO
-        explicit_qubo = insert_values(sym_qubo, pik)
-        
-        # Solve using QBSOLV with timeout parameter
-        solutions, energies = Utils.solve(explicit_qubo, offset, timeout=timeout)
+        # Optionally check the closed-form penalty against autoqubo's sampler
+        if getattr(params, "verify_qubo", False):
+            verify_assignment_penalty(n, new_constraint)
+
+        # Build (or reuse) the explicit QUBO for this instance
+        qubo = qubo_cache.get_or_build(instance_key(pik, "auto"), lambda: build_qubo(pik, n, m))
+        record_size(variables=qubo.size, qubo_nnz=qubo.nnz)
         
-        # Get best solution
-        best_idx = np.argmin(energies)
-        best_solution = solutions[best_idx]
-        assignment_matrix = np.array(best_solution).reshape(n, n)
-        job_order = np.argmax(assignment_matrix, axis=0).tolist()
+        # Solve using QBSOLV within what is left of the request deadline; it
+        # takes a single matrix, the penalty already encodes the constraints
+        with sampler_call(params, n, m, backend="qbsolv") as timeout:
+            solutions, energies = Utils.solve(qubo.explicit(), qubo.offset, timeout=timeout)
         
-        # Calculate makespan
-        C = np.zeros((n, m))
-        for i in range(n):
-            for j in range(m):
-                if i == 0 and j == 0:
-                    C[i, j] = pik[job_order[i], j]
-                elif i == 0:
-                    C[i, j] = C[i, j-1] + pik[job_order[i], j]
-                elif j == 0:
-                    C[i, j] = C[i-1, j] + pik[job_order[i], j]
-                else:
-                    C[i, j] = max(C[i-1, j], C[i, j-1]) + pik[job_order[i], j]
+        # Every returned sample decoded and scored by makespan; the best schedule is polished
+        schedule = postprocess(zip(energies, solutions), pik, params)
         
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
         
         return {
-            "makespan": float(C[n-1, m-1]),
-            "sequence": [j + 1 for j in job_order],  # Convert to 1-based indexing
-            "energy": float(energies[best_idx]),
+            "makespan": schedule["makespan"],
+            "sequence": [j + 1 for j in schedule["sequence"]],  # Convert to 1-based indexing
+            "energy": schedule["energy"],
             "execution_time": execution_time,
             "num_occurrences": len(solutions),
-            "solution_quality": float(1.0 / (1.0 + abs(energies[best_idx])))
+            "solution_quality": float(1.0 / (1.0 + abs(schedule["energy"]))),
+            **{key: schedule[key] for key in SAMPLE_FIELDS}
         }
     except Exception as e:
-        print(f"Error in solve_with_auto_qbsolv: {str(e)}")
+        logger.error("Error in solve_with_auto_qbsolv: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+def build_qubo(pik, n, m):
+    """Qubo of the auto-generated formulation"""
+    # Closed-form permutation penalty plus pairwise sequencing costs
+    with phase("distances"):
+        costs = compute_pairwise_costs(pik, n, m)
+    return auto_qubo(costs, n)
+
 # Constraint function for ensuring valid job assignments
 def new_constraint(x):
     """
@@ -89,9 +82,4 @@ def compute_pairwise_costs(pik, n, m):
     For each adjacent pair in the sequence, the cost is the sum of absolute differences
     between job i's processing times on machines 2..m and job j's processing times on machines 1..m-1.
     """
-    dist = np.zeros((n, n))
-    for i in range(n):
-        for j in range(n):
-            if i != j:
-                dist[i, j] = np.sum(np.abs(pik[i, 1:m] - pik[j, :m-1]))
-    return dist
\ No newline at end of file
+    return pairwise_cost_matrix(pik)
@@ -0,0 +1,88 @@
+import numpy as np
+from typing import Dict, Optional
+
+from .qubo_cache import instance_key, qubo_cache
+from .timing import phase
+
+__all__ = ['machine_bound', 'job_bound', 'two_machine_bound', 'lower_bounds', 'optimality_gap']
+
+def _heads_tails(p: np.ndarray):
+    # head[j, i]: work of job j before machine i; tail[j, i]: after it
+    prefix = np.cumsum(p, axis=1)
+    return prefix - p, prefix[:, -1:] - prefix
+
+def machine_bound(pik) -> float:
+    """
+    Taillard's machine-based bound: every machine processes all jobs, after
+    the shortest head of any job and before the shortest tail.
+    """
+    p = np.asarray(pik, dtype=np.float64)
+    head, tail = _heads_tails(p)
+    return float(np.max(head.min(axis=0) + p.sum(axis=0) + tail.min(axis=0)))
+
+def job_bound(pik) -> float:
+    """
+    Taillard's job-based bound: the total processing time of a job plus,
+    for every other job, the shorter of its first and last machine times
+    (it is either on the first machine before the job starts or on the
+    last one after the job ends). Maximized over jobs.
+    """
+    p = np.asarray(pik, dtype=np.float64)
+    others = np.minimum(p[:, 0], p[:, -1])
+    return float(np.max(p.sum(axis=1) + others.sum() - others))
+
+def two_machine_bound(pik) -> float:
+    """
+    Two-machine relaxation: for every machine pair (u, v), u < v, the jobs
+    only compete for u and v, the machines in between become a time lag
+    per job, and the two-machine problem with lags is solved exactly by
+    Johnson's rule on (p_u + lag, lag + p_v) (Mitten). Heads before u and
+    tails after v are added as in the machine bound.
+    """
+    p = np.asarray(pik, dtype=np.float64)
+    n, m = p.shape
+    if m < 2:
+        return machine_bound(p)
+    head, tail = _heads_tails(p)
+    prefix = np.cumsum(p, axis=1)
+    best = 0.0
+    for u in range(m - 1):
+        for v in range(u + 1, m):
+            lag = prefix[:, v - 1] - prefix[:, u]
+            a, b = p[:, u] + lag, lag + p[:, v]
+            first = a <= b
+            order = np.concatenate([
+                np.flatnonzero(first)[np.argsort(a[first], kind="stable")],
+                np.flatnonzero(~first)[np.argsort(-b[~first], kind="stable")],
+            ])
+            # C_v(last) = max_k (C_u(k) + lag_k + p_v of jobs k..n)
+            done_u = np.cumsum(p[order, u])
+            rest_v = np.cumsum(p[order, v][::-1])[::-1]
+            span = np.max(done_u + lag[order] + rest_v)
+            best = max(best, head[:, u].min() + span + tail[:, v].min())
+    return float(best)
+
+def lower_bounds(pik) -> Dict[str, float]:
+    """
+    All bounds of an instance and their maximum ("lower_bound"), computed
+    once per instance and kept in the QUBO cache.
+    """
+    def build():
+        with phase("lower_bound"):
+            bounds = {
+                "machine": machine_bound(pik),
+                "job": job_bound(pik),
+                "two_machine": two_machine_bound(pik),
+            }
+        bounds["lower_bound"] = max(bounds.values())
+        return bounds
+
+    return qubo_cache.get_or_build(instance_key(pik, "lower-bound"), build)
+
+def optimality_gap(makespan: float, lower_bound: Optional[float]) -> Optional[float]:
+    """
+    (makespan - lower_bound) / lower_bound; 0 means proven optimal.
+    """
+    if lower_bound is None or lower_bound <= 0:
+        return None
+    return max(makespan - lower_bound, 0.0) / lower_bound
@@ -0,0 +1,302 @@
+import os
+import time
+import queue
+import multiprocessing as mp
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .bounds import lower_bounds
+from .classical_solver import neh
+from .deadline import cost_model
+from .evaluator import sequence_makespan
+from .timing import current_deadline, phase, record_size, report_incumbent, stop_requested
+from .warm_start import seed_sequences
+
+__all__ = ['BranchAndBound', 'branch_and_bound', 'solve_with_branch_and_bound']
+
+# Search nodes between checks of the time limit, the stop flag and idle workers
+CHECK_INTERVAL = 256
+
+# (bound, prefix, completion times of the prefix per machine, remaining jobs)
+Node = Tuple[float, Tuple[int, ...], np.ndarray, np.ndarray]
+
+def _min_excluding(A: np.ndarray) -> np.ndarray:
+    """
+    out[j, i] = min over rows l != j of A[l, i] (A has at least two rows).
+    """
+    cols = np.arange(A.shape[1])
+    two = np.argpartition(A, 1, axis=0)[:2]
+    out = np.repeat(A[two[0], cols][None, :], A.shape[0], axis=0)
+    out[two[0], cols] = A[two[1], cols]
+    return out
+
+class BranchAndBound:
+    """
+    Depth-first branch-and-bound over job prefixes. A node fixes the first
+    jobs of the sequence; its children append one more job. Every child is
+    bounded (all children of a node at once) by the one-machine bound: on
+    each machine the remaining jobs start no earlier than the prefix allows,
+    run back to back and the last one still needs the shortest remaining
+    tail. Children are searched best bound first and pruned against the
+    incumbent makespan.
+    """
+
+    def __init__(self, p: np.ndarray):
+        self.p = np.asarray(p, dtype=np.float64)
+        self.n, self.m = self.p.shape
+        # Work of each job after machine i
+        self.tails = self.p[:, ::-1].cumsum(axis=1)[:, ::-1] - self.p
+        self.nodes = 0
+
+    def node(self, prefix: Tuple[int, ...], bound: float = 0.0) -> Node:
+        C = np.zeros(self.m)
+        for job in prefix:
+            prev = 0.0
+            for i in range(self.m):
+                prev = max(prev, C[i]) + self.p[job, i]
+                C[i] = prev
+        remaining = np.setdiff1d(np.arange(self.n), np.asarray(prefix, dtype=np.intp))
+        return bound, tuple(prefix), C, remaining
+
+    def children(self, node: Node) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (bounds (k,), completion times (k, m)) of appending each remaining job.
+        """
+        _, _, C, R = node
+        pr = self.p[R]
+        Cc = np.empty_like(pr)
+        Cc[:, 0] = C[0] + pr[:, 0]
+        for i in range(1, self.m):
+            Cc[:, i] = np.maximum(Cc[:, i - 1], C[i]) + pr[:, i]
+        if len(R) == 1:
+            return Cc[:, -1].copy(), Cc
+        rest = pr.sum(axis=0) - pr
+        shortest = _min_excluding(np.hstack([pr[:, :-1], self.tails[R]]))
+        # The next job cannot reach machine i before finishing machine i-1
+        start = Cc.copy()
+        start[:, 1:] = np.maximum(Cc[:, 1:], Cc[:, :-1] + shortest[:, :self.m - 1])
+        bounds = (start + rest + shortest[:, self.m - 1:]).max(axis=1)
+        return bounds, Cc
+
+    def expand(self, node: Node, upper: float, offer: Callable[[List[int], float], None]) -> List[Node]:
+        """
+        Children of `node` that can still beat `upper`, best bound last (for
+        a DFS stack); complete sequences are passed to `offer` instead.
+        """
+        self.nodes += 1
+        bounds, Cc = self.children(node)
+        _, prefix, _, R = node
+        if len(R) == 1:
+            if bounds[0] < upper:
+                offer(list(prefix) + [int(R[0])], float(bounds[0]))
+            return []
+        order = np.lexsort((Cc[:, -1], bounds))[::-1]
+        return [(float(bounds[k]), prefix + (int(R[k]),), Cc[k], np.delete(R, k))
+                for k in order if bounds[k] < upper]
+
+    def search(self, stack: List[Node], upper: Callable[[], float], offer: Callable[[List[int], float], None],
+               should_stop: Callable[[], bool], share: Optional[Callable[[List[Node]], None]] = None) -> List[Node]:
+        """
+        Depth-first search of the nodes on `stack` until it is empty or
+        should_stop() (checked every CHECK_INTERVAL nodes). `share` may
+        take nodes off the bottom of the stack for idle workers. Returns
+        the open nodes left when stopped.
+        """
+        while stack:
+            if self.nodes % CHECK_INTERVAL == 0:
+                if should_stop():
+                    return [node for node in stack if node[0] < upper()]
+                if share is not None and len(stack) > 1:
+                    share(stack)
+            node = stack.pop()
+            ub = upper()
+            if node[0] >= ub:
+                continue
+            stack.extend(self.expand(node, ub, offer))
+        return []
+
+# Shared search state handed to each pool process by the initializer
+_worker_state: Dict[str, Any] = {}
+
+def _init_worker(p, tasks, pending, hungry, best_mk, best_seq, abort, target):
+    _worker_state.update(p=p, tasks=tasks, pending=pending, hungry=hungry, best_mk=best_mk,
+                         best_seq=best_seq, abort=abort, target=target)
+
+def _offer(seq: List[int], mk: float):
+    best_mk, best_seq = _worker_state["best_mk"], _worker_state["best_seq"]
+    with best_mk.get_lock():
+        if mk < best_mk.value:
+            best_mk.value = mk
+            best_seq[:] = seq
+
+def _share(stack: List[Node]):
+    """
+    Hand the shallowest open nodes (the largest subtrees) to idle workers.
+    """
+    hungry = _worker_state["hungry"].value
+    if hungry <= 0:
+        return
+    count = min(hungry, len(stack) - 1)
+    donated, stack[:count] = stack[:count], []
+    pending = _worker_state["pending"]
+    with pending.get_lock():
+        pending.value += count
+    for bound, prefix, _, _ in donated:
+        _worker_state["tasks"].put((bound, prefix))
+
+def _run_worker(time_limit: float) -> Tuple[int, Optional[float]]:
+    """
+    Take subtrees off the shared queue and search them until none are
+    left, the time limit passes, the parent aborts or the incumbent
+    reaches the target. Returns (nodes searched, lowest bound of the
+    nodes left open).
+    """
+    start_time = time.perf_counter()
+    state = _worker_state
+    search = BranchAndBound(state["p"])
+    upper = lambda: state["best_mk"].value
+
+    def should_stop():
+        return (time.perf_counter() - start_time > time_limit or state["abort"].value
+                or state["best_mk"].value <= state["target"])
+
+    open_bound = None
+    while not should_stop() and state["pending"].value > 0:
+        try:
+            bound, prefix = state["tasks"].get(timeout=0.01)
+        except queue.Empty:
+            continue
+        with state["hungry"].get_lock():
+            state["hungry"].value -= 1
+        left = search.search([search.node(prefix, bound)], upper, _offer, should_stop, _share)
+        if left:
+            lowest = min(node[0] for node in left)
+            open_bound = lowest if open_bound is None else min(open_bound, lowest)
+        with state["hungry"].get_lock():
+            state["hungry"].value += 1
+        with state["pending"].get_lock():
+            state["pending"].value -= 1
+    return search.nodes, open_bound
+
+def branch_and_bound(pik, seq: List[int], time_limit: float, target: float = 0.0,
+                     workers: int = 1) -> Tuple[List[int], float, float, int]:
+    """
+    Exact search from the incumbent `seq`. Stops when the tree is
+    exhausted, after `time_limit` seconds, when the caller stops the
+    request or when the incumbent reaches `target` (a lower bound of the
+    instance). With workers > 1 the tree is split across a process pool:
+    the first levels are expanded into a shared queue of subtrees and busy
+    workers give away their shallowest open nodes whenever one is idle.
+    Returns (best sequence, makespan, proven lower bound, nodes searched);
+    the bound equals the makespan when the search completed.
+    """
+    start_time = time.perf_counter()
+    p = np.asarray(pik, dtype=np.float64)
+    n = p.shape[0]
+    best = {"seq": list(seq), "mk": sequence_makespan(seq, p)}
+    search = BranchAndBound(p)
+
+    def offer(candidate: List[int], mk: float):
+        if mk < best["mk"]:
+            best.update(seq=candidate, mk=mk)
+            report_incumbent(candidate, mk)
+
+    def should_stop():
+        return time.perf_counter() - start_time > time_limit or stop_requested() or best["mk"] <= target
+
+    root = search.node((), 0.0)
+    workers = max(1, min(workers, os.cpu_count() or 1))
+    if workers == 1 or n < 4:
+        left = search.search([root], lambda: best["mk"], offer, should_stop)
+        return best["seq"], best["mk"], _proven_bound(best["mk"], target, [node[0] for node in left]), search.nodes
+
+    # Expand the best nodes breadth-first until every worker has a few subtrees
+    frontier = [root]
+    while frontier and len(frontier) < 4 * workers:
+        frontier.sort(key=lambda node: node[0])
+        frontier.extend(search.expand(frontier.pop(0), best["mk"], offer))
+    if not frontier or best["mk"] <= target:
+        return best["seq"], best["mk"], _proven_bound(best["mk"], target, []), search.nodes
+
+    ctx = mp.get_context()
+    tasks = ctx.Queue()
+    pending = ctx.Value('i', len(frontier))
+    hungry = ctx.Value('i', workers)
+    best_mk = ctx.Value('d', best["mk"])
+    best_seq = ctx.Array('i', best["seq"], lock=False)
+    abort = ctx.Value('b', 0, lock=False)
+    for bound, prefix, _, _ in sorted(frontier, key=lambda node: node[0]):
+        tasks.put((bound, prefix))
+
+    remaining = max(time_limit - (time.perf_counter() - start_time), 0.0)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(p, tasks, pending, hungry, best_mk, best_seq, abort, target)) as pool:
+        futures = [pool.submit(_run_worker, remaining) for _ in range(workers)]
+        running = set(futures)
+        while running:
+            _, running = wait(running, timeout=0.1, return_when=FIRST_COMPLETED)
+            # Incumbents found by the workers reach a streaming caller from here
+            if best_mk.value < best["mk"]:
+                with best_mk.get_lock():
+                    best.update(seq=list(best_seq[:]), mk=best_mk.value)
+                report_incumbent(best["seq"], best["mk"])
+            if stop_requested():
+                abort.value = 1
+        results = [future.result() for future in futures]
+
+    with best_mk.get_lock():
+        best.update(seq=list(best_seq[:]), mk=best_mk.value)
+    # Subtrees nobody got to before the stop are still open
+    open_bounds = [bound for _, bound in results if bound is not None]
+    while True:
+        try:
+            open_bounds.append(tasks.get(timeout=0.05)[0])
+        except queue.Empty:
+            break
+    return best["seq"], best["mk"], _proven_bound(best["mk"], target, open_bounds), \
+        search.nodes + sum(nodes for nodes, _ in results)
+
+def _proven_bound(makespan: float, target: float, open_bounds: List[float]) -> float:
+    # Every better schedule lies below an open node, so the lowest open bound holds
+    if makespan <= target:
+        return makespan
+    return max(target, min([makespan] + list(open_bounds)))
+
+def solve_with_branch_and_bound(job_matrix, params):
+    """
+    Exact solver for small and medium instances (n up to about 20):
+    branch-and-bound from the best of NEH and the warm-start sequences,
+    within the request deadline. The result's "lower_bound" is what the
+    search proved; it equals the makespan ("optimal") unless the deadline
+    or a stop cut the search short.
+    """
+    start_time = time.perf_counter()
+    n = job_matrix.jobs
+    m = job_matrix.machines
+    pik = job_matrix.processing_times
+    p = np.asarray(pik, dtype=np.float64)
+    deadline = current_deadline(params.timeout)
+    reserve = cost_model.estimate("makespan", n, m)
+    record_size(variables=0)
+
+    with phase("neh"):
+        candidates = seed_sequences(pik, params) + [neh(pik, n, m)[0]]
+        seq = min(candidates, key=lambda s: sequence_makespan(s, p))
+    report_incumbent(seq, sequence_makespan(seq, p))
+
+    with phase("branch_and_bound"):
+        seq, makespan, bound, nodes = branch_and_bound(
+            p, seq, deadline.budget_for(reserve), target=lower_bounds(pik)["lower_bound"],
+            workers=getattr(params, "workers", None) or 1)
+
+    return {
+        "sequence": [j + 1 for j in seq],  # 1-based for the frontend
+        "makespan": makespan,
+        "energy": 0.0,  # Not applicable for the exact solver
+        "execution_time": time.perf_counter() - start_time,
+        "lower_bound": bound,
+        "optimal": makespan <= bound,
+        "nodes": nodes,
+    }
@@ -1,6 +1,13 @@
 import time
 import random
-from typing import List, Tuple, Dict, Any
+import numpy as np
+from typing import List, Optional, Tuple, Dict, Any
+
+from .evaluator import sequence_makespan
+from .insertion import best_insertion
+from .local_search import local_search
+from .deadline import cost_model
+from .timing import current_deadline, current_lower_bound, phase, report_incumbent, stop_requested
 
 def makespan(seq: List[int], pik: List[List[float]], m: int) -> float:
     """
@@ -8,15 +15,7 @@ def makespan(seq: List[int], pik: List[List[float]], m: int) -> float:
     seq: permutation of job indices [0 .. n-1]
     pik[j][k]: processing time of job j on machine k
     """
-    machine_end = [0] * m
-    job_end = [0] * len(pik)
-    for job in seq:
-        for k in range(m):
-            start = machine_end[k] if k == 0 else max(job_end[job], machine_end[k])
-            finish = start + pik[job][k]
-            job_end[job] = finish
-            machine_end[k] = finish
-    return machine_end[-1]
+    return sequence_makespan(seq, pik)
 
 def neh(pik: List[List[float]], n: int, m: int) -> Tuple[List[int], float]:
     """
@@ -24,20 +23,19 @@ def neh(pik: List[List[float]], n: int, m: int) -> Tuple[List[int], float]:
       1) Sort jobs by descending total processing time.
       2) Build a sequence incrementally by inserting each job at the position
          that yields the lowest partial makespan.
+    All insertion positions of a job are scored at once with Taillard's
+    head/tail acceleration, so a full NEH pass costs O(n^2 m).
     Returns (sequence, makespan).
     """
-    totals = [sum(p) for p in pik]
+    p = np.asarray(pik, dtype=np.float64)
+    totals = [sum(row) for row in pik]
     sorted_jobs = sorted(range(n), key=lambda j: -totals[j])
 
     seq = [sorted_jobs[0]]
+    best_mk = float(p[sorted_jobs[0]].sum())
     for job in sorted_jobs[1:]:
-        best_seq, best_mk = None, float("inf")
-        for pos in range(len(seq) + 1):
-            trial = seq[:pos] + [job] + seq[pos:]
-            mk = makespan(trial, pik, m)
-            if mk < best_mk:
-                best_mk, best_seq = mk, trial
-        seq = best_seq
+        pos, best_mk = best_insertion(seq, job, p)
+        seq.insert(pos, job)
     return seq, best_mk
 
 def local_search_swap(seq: List[int], pik: List[List[float]], m: int) -> Tuple[List[int], float]:
@@ -46,69 +44,62 @@ def local_search_swap(seq: List[int], pik: List[List[float]], m: int) -> Tuple[L
       - Try swapping every pair (i, j) in the current sequence.
       - If any swap improves the makespan, accept it immediately and repeat.
       - Stop when no swap yields an improvement.
+    Swaps are scored incrementally from cached head/tail completion times
+    (see local_search.local_search).
     """
-    current_seq = seq[:]
-    current_mk = makespan(current_seq, pik, m)
-    improved = True
+    return local_search(seq, pik, neighbourhood="swap", strategy="first")
+
+def ig_iteration(seq: List[int], p: np.ndarray, k_remove: int, rng, neighbourhood: str = "swap",
+                 strategy: str = "first", time_limit: Optional[float] = None) -> Tuple[List[int], float]:
+    """
+    One destruction / construction / local search step of iterated greedy.
+    rng: random number source (a random.Random instance or the random module)
+    Returns the new (sequence, makespan); `seq` itself is left untouched.
+    """
+    # Destruction phase: remove k jobs randomly
+    temp_seq = seq[:]
+    removed_jobs = []
+    for _ in range(min(k_remove, len(temp_seq))):
+        if not temp_seq:  # Safety check
+            break
+        idx = rng.randint(0, len(temp_seq) - 1)
+        removed_jobs.append(temp_seq.pop(idx))
+
+    # Construction phase: reinsert using NEH (Taillard-accelerated)
+    for job in removed_jobs:
+        best_pos, _ = best_insertion(temp_seq, job, p)
+        temp_seq.insert(best_pos, job)
 
-    while improved:
-        improved = False
-        for i in range(len(current_seq) - 1):
-            for j in range(i + 1, len(current_seq)):
-                trial = current_seq[:]
-                trial[i], trial[j] = trial[j], trial[i]
-                mk = makespan(trial, pik, m)
-                if mk < current_mk:
-                    current_seq, current_mk = trial, mk
-                    improved = True
-                    break
-            if improved:
-                break
-    return current_seq, current_mk
+    # Local search phase
+    return local_search(temp_seq, p, neighbourhood, strategy, time_limit=time_limit)
 
-def iterated_greedy(seq: List[int], pik: List[List[float]], m: int, k_remove: int, iterations: int, max_time: float, start_time: float) -> Tuple[List[int], float]:
+def iterated_greedy(seq: List[int], pik: List[List[float]], m: int, k_remove: int, iterations: int, max_time: float, start_time: float,
+                    neighbourhood: str = "swap", strategy: str = "first", rng: Optional[random.Random] = None) -> Tuple[List[int], float]:
     """
     Iterated Greedy algorithm:
       1) Start with an initial solution (typically from NEH)
       2) Repeat for a specified number of iterations:
          a) Destruction: Remove k jobs randomly from the sequence
          b) Construction: Reinsert the removed jobs using the NEH insertion procedure
-         c) Local search: Apply pairwise swap to the new solution
+         c) Local search: Apply swap or insertion local search to the new solution
          d) Accept the new solution if it's better than the current best
       3) Return the best solution found
+    rng: optional seeded random.Random; defaults to the global random module
     """
+    rng = rng or random
+    p = np.asarray(pik, dtype=np.float64)
     current_seq = seq[:]
     current_mk = makespan(current_seq, pik, m)
     best_seq = current_seq[:]
     best_mk = current_mk
     
     for i in range(iterations):
-        # Check if we've exceeded the time limit
-        if time.perf_counter() - start_time > max_time:
+        # Check if we've exceeded the time limit or the caller stopped early
+        if time.perf_counter() - start_time > max_time or stop_requested():
             break
-            
-        # Destruction phase: remove k jobs randomly
-        temp_seq = current_seq[:]
-        removed_jobs = []
-        for _ in range(min(k_remove, len(temp_seq))):
-            if not temp_seq:  # Safety check
-                break
-            idx = random.randint(0, len(temp_seq) - 1)
-            removed_jobs.append(temp_seq.pop(idx))
-        
-        # Construction phase: reinsert using NEH
-        for job in removed_jobs:
-            best_pos, best_pos_mk = 0, float("inf")
-            for pos in range(len(temp_seq) + 1):
-                trial = temp_seq[:pos] + [job] + temp_seq[pos:]
-                mk = makespan(trial, pik, m)
-                if mk < best_pos_mk:
-                    best_pos_mk = mk
-                    best_pos = pos
-            temp_seq.insert(best_pos, job)
-        
-        # Local search phase
-        temp_seq, temp_mk = local_search_swap(temp_seq, pik, m)
+
+        time_left = max(max_time - (time.perf_counter() - start_time), 0.0)
+        temp_seq, temp_mk = ig_iteration(current_seq, p, k_remove, rng, neighbourhood, strategy, time_limit=time_left)
         
         # Accept if better
         if temp_mk < best_mk:
@@ -116,6 +107,7 @@ def iterated_greedy(seq: List[int], pik: List[List[float]], m: int, k_remove: in
             best_mk = temp_mk
             current_seq = temp_seq[:]
             current_mk = temp_mk
+            report_incumbent(best_seq, best_mk, iteration=i + 1)
     
     return best_seq, best_mk
 
@@ -132,27 +124,49 @@ def solve_with_classical_algorithm(job_matrix: Dict[str, Any], params: Dict[str,
     timeout = params.get("timeout", 60.0)
     iteration_count = params.get("iteration_count", 10000)
     k_remove = params.get("k_remove", 100)
+    neighbourhood = params.get("neighbourhood") or "swap"
+    strategy = params.get("local_search_strategy") or "first"
+    workers = params.get("workers") or 1
+    seed = params.get("seed")
+    rng = random.Random(seed) if seed is not None else random
+    worker_stats = None
     
-    # Start timing
+    # Start timing; every phase draws on the request deadline (build, NEH,
+    # local search and IG together stay within `timeout`)
     start_time = time.perf_counter()
+    deadline = current_deadline(timeout)
+    # Kept back for assembling the result after the last phase
+    reserve = cost_model.estimate("makespan", n, m)
     
     # Run NEH algorithm
-    seq, makespan_value = neh(pik, n, m)
-    
-    # Time allocation: 20% for NEH, 30% for local search, 50% for iterated greedy
-    time_elapsed = time.perf_counter() - start_time
-    time_remaining = timeout - time_elapsed
+    with phase("neh"):
+        seq, makespan_value = neh(pik, n, m)
+    report_incumbent(seq, makespan_value)
     
-    # Apply local search to improve the solution if time permits
-    if time_remaining > 0.3 * timeout:
-        seq, makespan_value = local_search_swap(seq, pik, m)
+    # Apply local search when its estimated cost for this instance size fits
+    # the remaining budget; the time limit caps it should the estimate be off
+    if deadline.remaining() > cost_model.estimate("local_search", n, m) + reserve and not stop_requested():
+        with phase("local_search"):
+            seq, makespan_value = local_search(seq, pik, neighbourhood, strategy,
+                                               time_limit=deadline.budget_for(reserve))
+        report_incumbent(seq, makespan_value)
     
-    # Apply iterated greedy if time permits and parameters are provided
-    time_elapsed = time.perf_counter() - start_time
-    time_remaining = timeout - time_elapsed
+    # Iterated greedy gets whatever is left of the deadline
+    time_remaining = deadline.budget_for(reserve)
     
-    if time_remaining > 0.2 * timeout and iteration_count > 0 and k_remove > 0:
-        seq, makespan_value = iterated_greedy(seq, pik, m, k_remove, iteration_count, time_remaining, time.perf_counter())
+    if time_remaining > 0 and iteration_count > 0 and k_remove > 0 and not stop_requested():
+        with phase("iterated_greedy"):
+            if workers > 1:
+                # Imported here because parallel_ig builds on this module
+                from .parallel_ig import parallel_iterated_greedy
+                seq, makespan_value, worker_stats = parallel_iterated_greedy(
+                    seq, pik, k_remove, iteration_count, time_remaining, workers,
+                    seed=seed, neighbourhood=neighbourhood, strategy=strategy,
+                    target=current_lower_bound()
+                )
+            else:
+                seq, makespan_value = iterated_greedy(seq, pik, m, k_remove, iteration_count, time_remaining, time.perf_counter(),
+                                                      neighbourhood, strategy, rng=rng)
     
     # Calculate execution time
     execution_time = time.perf_counter() - start_time
@@ -161,9 +175,12 @@ def solve_with_classical_algorithm(job_matrix: Dict[str, Any], params: Dict[str,
     one_indexed_seq = [j + 1 for j in seq]
     
     # Return results in the same format as other solvers
-    return {
+    result = {
         "sequence": one_indexed_seq,
         "makespan": makespan_value,
         "energy": 0.0,  # Not applicable for classical solver
         "execution_time": execution_time
-    }
\ No newline at end of file
+    }
+    if worker_stats is not None:
+        result["workers"] = worker_stats
+    return result
\ No newline at end of file
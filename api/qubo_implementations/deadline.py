@@ -0,0 +1,112 @@
+import time
+import threading
+from typing import Dict, Optional
+
+__all__ = ['Deadline', 'PhaseCostModel', 'cost_model']
+
+class Deadline:
+    """
+    Absolute end time of a request on the monotonic clock. Created once per
+    solve from params.timeout and shared by every phase, so QUBO
+    construction, the sampler call and decoding all come out of one budget.
+    """
+
+    def __init__(self, budget: float, start: Optional[float] = None):
+        self.budget = float(budget)
+        self.start = time.perf_counter() if start is None else start
+        self.end = self.start + self.budget
+
+    def remaining(self) -> float:
+        return max(self.end - time.perf_counter(), 0.0)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def expired(self) -> bool:
+        return time.perf_counter() >= self.end
+
+    def budget_for(self, reserve: float = 0.0, minimum: float = 0.0) -> float:
+        """
+        Time a phase may use while leaving `reserve` seconds for the phases
+        after it; never less than `minimum`.
+        """
+        return max(self.remaining() - reserve, minimum)
+
+# Work units of a phase for an n x m instance; estimates scale linearly in them
+_UNITS = {
+    "distances": lambda n, m: n * n * m,
+    "qubo_assembly": lambda n, m: n ** 3,
+    "sampler_setup": lambda n, m: n ** 2,
+    "decode": lambda n, m: n ** 2,
+    "repair": lambda n, m: n ** 3,
+    "makespan": lambda n, m: n * m,
+    "neh": lambda n, m: n * n * m,
+    "local_search": lambda n, m: n * n * m,
+    "lower_bound": lambda n, m: n * m * m,
+}
+
+class PhaseCostModel:
+    """
+    Online estimate of phase durations from instance size. Each phase keeps
+    an exponentially weighted average of seconds per work unit, fed with the
+    timings of finished solves; sampler calls additionally learn their fixed
+    overhead (upload, queueing, download) per backend.
+    """
+
+    # Conservative starting rates (seconds per unit), measured on small hosts
+    DEFAULT_RATES = {
+        "distances": 2e-8,
+        "qubo_assembly": 5e-8,
+        "sampler_setup": 2e-7,
+        "decode": 1e-7,
+        "repair": 1e-8,
+        "makespan": 1e-6,
+        "neh": 5e-8,
+        "local_search": 5e-7,
+        "lower_bound": 1e-7,
+    }
+    BASE_COST = 1e-3
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self._rates: Dict[str, float] = dict(self.DEFAULT_RATES)
+        self._overheads: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def estimate(self, phase: str, n: int, m: int) -> float:
+        if phase not in _UNITS:
+            return self.BASE_COST
+        with self._lock:
+            rate = self._rates[phase]
+        return self.BASE_COST + rate * _UNITS[phase](n, m)
+
+    def observe(self, phase: str, n: int, m: int, seconds: float):
+        if phase not in _UNITS:
+            return
+        units = max(_UNITS[phase](n, m), 1)
+        rate = max(seconds - self.BASE_COST, 0.0) / units
+        with self._lock:
+            self._rates[phase] += self.alpha * (rate - self._rates[phase])
+
+    def observe_report(self, report: Dict):
+        """
+        Learn from a finished solve's timing report (see PhaseTimer.report).
+        """
+        sizes = report.get("sizes", {})
+        if "jobs" not in sizes or "machines" not in sizes:
+            return
+        for phase, seconds in report.get("phases", {}).items():
+            self.observe(phase, sizes["jobs"], sizes["machines"], seconds)
+
+    def overhead(self, backend: str) -> float:
+        with self._lock:
+            return self._overheads.get(backend, 0.0)
+
+    def observe_overhead(self, backend: str, seconds: float):
+        seconds = max(seconds, 0.0)
+        with self._lock:
+            previous = self._overheads.get(backend)
+            self._overheads[backend] = seconds if previous is None else previous + self.alpha * (seconds - previous)
+
+# Shared by every request of this process
+cost_model = PhaseCostModel()
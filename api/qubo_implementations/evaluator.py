@@ -0,0 +1,54 @@
+import numpy as np
+from typing import Sequence, Tuple, Union
+
+__all__ = [
+    'batch_makespan',
+    'sequence_makespan',
+]
+
+def batch_makespan(perms, p, return_completion: bool = False, start=None) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Makespans of a batch of job sequences.
+    perms: (B, L) integer array, row b is a sequence of job indices
+    p[j][k]: processing time of job j on machine k
+    return_completion: also return the (B, L, m) completion-time matrices
+    start: optional (m,) or (B, m) machine release times, e.g. the completion
+           times of a fixed prefix, so only the remaining segment is simulated
+
+    The schedule is built one position at a time. Within a position the
+    recurrence along the machine axis
+      C[b][i][k] = max(C[b][i-1][k], C[b][i][k-1]) + p[perms[b][i]][k]
+    is a max-plus prefix scan, evaluated for all machines and all sequences
+    of the batch in a few NumPy calls:
+      C[b][i][k] = S[k] + max_{l<=k}(C[b][i-1][l] - S[l-1]),  S = cumsum(p row)
+    Only one (B, m) row is kept unless completion times are requested.
+    """
+    p = np.asarray(p, dtype=np.float64)
+    perms = np.asarray(perms, dtype=np.intp)
+    if perms.ndim == 1:
+        perms = perms[None, :]
+    batch, length = perms.shape
+    m = p.shape[1]
+
+    prev = np.zeros((batch, m), dtype=np.float64)
+    if start is not None:
+        prev[:] = start
+    completion = np.empty((batch, length, m), dtype=np.float64) if return_completion else None
+    s_before = np.zeros((batch, m), dtype=np.float64)
+    for i in range(length):
+        s = np.cumsum(p[perms[:, i]], axis=1)
+        s_before[:, 1:] = s[:, :-1]
+        prev = s + np.maximum.accumulate(prev - s_before, axis=1)
+        if return_completion:
+            completion[:, i] = prev
+
+    makespans = prev[:, -1].copy()
+    if return_completion:
+        return makespans, completion
+    return makespans
+
+def sequence_makespan(seq: Sequence[int], p) -> float:
+    """
+    Makespan of a single job sequence (0-based job indices).
+    """
+    return float(batch_makespan(np.asarray(seq, dtype=np.intp)[None, :], p)[0])
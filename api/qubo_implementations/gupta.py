@@ -1,81 +1,43 @@
 import numpy as np
-from titanq import Model, Vtype, Target
 import time
 
+from .distances import d2_matrix
+from .local_sampler import create_model, sampler_call
+from .qubo import Qubo
+from .qubo_builder import create_adjacency_qubo
+from .qubo_cache import instance_key, qubo_cache
+from .repair import SAMPLE_FIELDS, postprocess
+from .timing import phase, record_size
+from .warm_start import warm_start_kwargs, with_seeds
+
 __all__ = ['solve_with_gupta_qubo']
 
 def compute_d2(pik, n, m):
-    # build CT then d2
-    CT = [[0]*n for _ in range(n)]
-    for j in range(1, m+1):
-        CT = [
-            [max(CT[u][v], sum(pik[u][:j])) for v in range(n)]
-            for u in range(n)
-        ]
-    return [[CT[u][v] - sum(pik[u]) for v in range(n)] for u in range(n)]
+    return d2_matrix(pik)
 
 def create_qubo(dmat, n, penalty=2.0):
-    size = n * n
-    W = np.zeros((size, size), dtype=np.float32)
-    b = np.zeros(size, dtype=np.float32)
-
-    # objective weights
-    for i in range(n):
-        for j in range(n):
-            if i == j: continue
-            for p_pos in range(n - 1):
-                W[i*n + p_pos, j*n + p_pos + 1] += dmat[i][j]
-
-    # bias on last position of each job
-    for i in range(n):
-        b[i*n + (n - 1)] += penalty
-
-    # constraints: each job exactly once, each position exactly one job
-    CW = np.zeros((2*n, size), dtype=np.float32)
-    CB = np.zeros((2*n, 2), dtype=np.float32)
-
-    # job→position
-    for i in range(n):
-        for p_pos in range(n):
-            CW[i, i*n + p_pos] = 1
-        CB[i] = [1 - 1e-1, 1 + 1e-1]
-
-    # position→job
-    for p_pos in range(n):
-        for i in range(n):
-            CW[n + p_pos, i*n + p_pos] = 1
-        CB[n + p_pos] = [1 - 1e-1, 1 + 1e-1]
+    return create_adjacency_qubo(dmat, n, penalty)
 
-    return W, b, CW, CB
-
-def calculate_makespan(vec, pik, n, m):
-    order = [idx % n for idx, v in enumerate(vec) if v]
-    machine_end = [0]*m
-    job_end = [0]*n
-    for job in order:
-        for k in range(m):
-            start = machine_end[k] if k == 0 else max(job_end[job], machine_end[k])
-            end = start + pik[job][k]
-            job_end[job], machine_end[k] = end, end
-    return machine_end[-1]
+def build_qubo(pik, n, m):
+    """Qubo (canonical symmetric form) ready for the sampler"""
+    with phase("distances"):
+        d2 = compute_d2(pik, n, m)
+    W, b, CW, CB = create_qubo(d2, n)
+    return Qubo.from_matrix(W, b, constraint_weights=CW, constraint_bounds=CB)
 
 def solve_with_gupta_qubo(job_matrix, params):
-    start_time = time.time()
+    start_time = time.perf_counter()
     n = job_matrix.jobs
     m = job_matrix.machines
     pik = job_matrix.processing_times
 
-    # Compute d2 matrix
-    d2 = compute_d2(pik, n, m)
-
-    # Create QUBO matrices
-    W, b, CW, CB = create_qubo(d2, n)
+    # Create QUBO matrices (reused across requests for the same instance)
+    qubo = qubo_cache.get_or_build(instance_key(pik, "gupta"), lambda: build_qubo(pik, n, m))
+    record_size(variables=qubo.size, qubo_nnz=qubo.nnz, constraints=qubo.constraint_weights.shape[0])
 
-    # Setup TitanQ Model
-    model = Model(api_key="Your API Key")
-    model.add_variable_vector("x", size=n*n, vtype=Vtype.BINARY)
-    model.set_objective_matrices(0.5*(W + W.T), b, Target.MINIMIZE)
-    model.add_inequality_constraints_matrix(CW, CB)
+    # Setup sampler model (TitanQ or the local parallel-tempering sampler)
+    with phase("sampler_setup"):
+        model = qubo.to_model(create_model(params))
 
     # Set optimization parameters
     beta = (1.0 / np.geomspace(params.T_min, params.T_max, params.num_chains)).tolist()
@@ -83,29 +45,30 @@ def solve_with_gupta_qubo(job_matrix, params):
     # Get coupling multiplier parameter (default to 0.4 if not provided)
     coupling_multiplier = getattr(params, 'coupling_multiplier', 0.4)
     
-    res = model.optimize(
-        beta=beta,
-        timeout_in_secs=params.timeout,
-        num_engines=params.num_engines,
-        num_chains=params.num_chains,
-        coupling_mult=coupling_multiplier  # Add this line
-    )
-
-    # Get best solution
-    best_vec = min(res.result_items(), key=lambda x: x[0])[1]
-    makespan = calculate_makespan(best_vec, pik, n, m)
-    
-    # At line 95-105, replace the return statement with:
-    # Extract job sequence (add 1 to make it 1-based indexing)
-    sequence = [idx % n + 1 for idx, v in enumerate(best_vec) if v]
+    # Optionally start the chains from NEH / known schedules
+    warm_start = warm_start_kwargs(model, pik, params)
+
+    # The sampler gets what is left of the request deadline after the build
+    with sampler_call(params, n, m) as timeout:
+        res = model.optimize(
+            beta=beta,
+            timeout_in_secs=timeout,
+            num_engines=params.num_engines,
+            num_chains=params.num_chains,
+            coupling_mult=coupling_multiplier,  # Add this line
+            **warm_start
+        )
+
+    # Every sample decoded and scored by makespan; the best schedule is polished
+    schedule = postprocess(with_seeds(res.result_items(), model, warm_start), pik, params)
     
-    # At the end of the function:
-    execution_time = time.time() - start_time
+    execution_time = time.perf_counter() - start_time
     
     return {
-        "sequence": sequence,
-        "makespan": makespan,
-        "energy": float(min(res.result_items(), key=lambda x: x[0])[0]),
+        "sequence": [j + 1 for j in schedule["sequence"]],  # 1-based for the frontend
+        "makespan": schedule["makespan"],
+        "energy": schedule["energy"],
         "execution_time": execution_time,
-        "solution": [int(x) for x in best_vec]  # Convert to regular Python list of integers
+        "solution": schedule["solution"],
+        **{key: schedule[key] for key in SAMPLE_FIELDS}
     }
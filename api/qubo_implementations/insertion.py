@@ -0,0 +1,65 @@
+import numpy as np
+from typing import List, Tuple
+
+__all__ = ['heads', 'tails', 'insertion_makespans', 'best_insertion']
+
+def heads(ps: np.ndarray) -> np.ndarray:
+    """
+    Head (earliest completion time) matrix e of a partial sequence.
+    ps[i][k]: processing time of the job at position i on machine k
+    e[i][k] = max(e[i-1][k], e[i][k-1]) + ps[i][k]
+
+    The recurrence along the position axis is a max-plus prefix scan, so each
+    machine column is computed in one vectorized pass:
+      e[i][k] = S[i] + max_{l<=i}(e[l][k-1] - S[l-1]),  S = cumsum(ps[:, k])
+    """
+    n_pos, m = ps.shape
+    e = np.empty((n_pos, m), dtype=np.float64)
+    prev = np.zeros(n_pos, dtype=np.float64)
+    for k in range(m):
+        s = np.cumsum(ps[:, k])
+        s_before = np.concatenate(([0.0], s[:-1]))
+        e[:, k] = s + np.maximum.accumulate(prev - s_before)
+        prev = e[:, k]
+    return e
+
+def tails(ps: np.ndarray) -> np.ndarray:
+    """
+    Tail matrix q of a partial sequence: q[i][k] is the time from the start of
+    the job at position i on machine k until the end of the schedule.
+    q[i][k] = max(q[i+1][k], q[i][k+1]) + ps[i][k]
+    """
+    return heads(ps[::-1, ::-1])[::-1, ::-1]
+
+def insertion_makespans(seq: List[int], job: int, p: np.ndarray) -> np.ndarray:
+    """
+    Taillard acceleration: makespan of inserting `job` at each of the
+    len(seq) + 1 positions of `seq`, computed in a single O(nm) sweep.
+    p[j][k]: processing time of job j on machine k (NumPy array)
+    Returns an array whose entry i is the makespan with `job` at position i.
+    """
+    m = p.shape[1]
+    ps = p[seq]
+    n_pos = len(seq) + 1
+    e = np.zeros((n_pos, m), dtype=np.float64)
+    q = np.zeros((n_pos, m), dtype=np.float64)
+    if seq:
+        e[1:] = heads(ps)
+        q[:-1] = tails(ps)
+
+    # f[i][k]: completion time of `job` on machine k when inserted at position i
+    pj = p[job]
+    f = np.empty((n_pos, m), dtype=np.float64)
+    f[:, 0] = e[:, 0] + pj[0]
+    for k in range(1, m):
+        f[:, k] = np.maximum(f[:, k - 1], e[:, k]) + pj[k]
+    return (f + q).max(axis=1)
+
+def best_insertion(seq: List[int], job: int, p: np.ndarray) -> Tuple[int, float]:
+    """
+    Best position to insert `job` into `seq` (first one on ties).
+    Returns (position, makespan).
+    """
+    mks = insertion_makespans(seq, job, p)
+    pos = int(np.argmin(mks))
+    return pos, float(mks[pos])
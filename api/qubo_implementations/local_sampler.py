@@ -0,0 +1,302 @@
+import os
+import time
+import numpy as np
+from contextlib import contextmanager
+from scipy.sparse import csr_array, vstack
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .deadline import cost_model
+from .timing import current_deadline, phase, stop_requested
+
+__all__ = ['SAMPLERS', 'ParallelTemperingModel', 'LocalOptimizeResponse', 'create_model',
+           'sampler_backend', 'sampler_call']
+
+SAMPLERS = ("titanq", "local")
+
+def _enum_name(value) -> str:
+    # Accept titanq's Vtype/Target enums as well as plain strings
+    return str(getattr(value, "name", value)).upper()
+
+def _violation(s: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    return np.maximum(lo - s, 0) + np.maximum(s - hi, 0)
+
+class LocalOptimizeResponse:
+    """
+    Result of a local solve, shaped like titanq's OptimizeResponse: one
+    result vector per engine, each the best state seen by that engine.
+    """
+
+    def __init__(self, results: np.ndarray, energies: np.ndarray, metrics: Dict[str, Any]):
+        self._results = results
+        self._energies = energies
+        self._metrics = metrics
+
+    def result_vector(self) -> np.ndarray:
+        return self._results
+
+    def result_items(self) -> List[Tuple[float, np.ndarray]]:
+        """
+        [(objective value, result vector), ...], one entry per engine
+        """
+        return [(float(self._energies[i]), self._results[i]) for i in range(len(self._results))]
+
+    def computation_metrics(self, key: Optional[str] = None) -> Any:
+        return self._metrics[key] if key else self._metrics
+
+class ParallelTemperingModel:
+    """
+    In-process replacement for titanq.Model on binary problems:
+      minimize 1/2 x^T W x + b^T x  subject to  lo <= CW x <= hi
+    with titanq's convention (the 1/2 applies to W, diagonal included, not
+    to b), so the same set_objective_matrices inputs describe the same
+    problem, energies included, on both backends. Solved with vectorized
+    parallel tempering. Every engine runs its own
+    ladder of `num_chains` replicas at the given `beta` values; constraints
+    are enforced through a quadratic penalty on the bound violation.
+
+    Single-flip Metropolis sweeps keep the local fields W x and the
+    constraint activities CW x of every replica up to date incrementally, so
+    a flip costs O(deg(i)) per replica. After each sweep adjacent replicas of
+    an engine attempt a replica exchange.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        self._size: Optional[int] = None
+        self._weights: Optional[csr_array] = None
+        self._bias: Optional[np.ndarray] = None
+        self._constant = 0.0
+        self._mask: Optional[csr_array] = None
+        self._bounds: Optional[np.ndarray] = None
+
+    def add_variable_vector(self, name: str = "x", size: int = 1, vtype=None):
+        if self._size is not None:
+            raise ValueError("The local sampler supports a single variable vector")
+        if vtype is not None and _enum_name(vtype) != "BINARY":
+            raise ValueError(f"The local sampler only supports binary variables, got {vtype}")
+        self._size = size
+        return name
+
+    def set_objective_matrices(self, weights, bias, target=None, constant_term: float = 0.0):
+        if self._size is None:
+            raise ValueError("Add a variable vector before setting the objective")
+        size = self._size
+        W = csr_array((size, size), dtype=np.float64) if weights is None else csr_array(weights, dtype=np.float64)
+        b = np.asarray(bias, dtype=np.float64).ravel()
+        if W.shape != (size, size) or b.shape != (size,):
+            raise ValueError("Objective shape does not match the variable vector")
+        if target is not None and _enum_name(target) == "MAXIMIZE":
+            W, b, constant_term = -W, -b, -constant_term
+        # Stored as J = 1/2 sym(W), so that x^T J x = 1/2 x^T W x; objective()
+        # and the flip deltas of the sweep work on J
+        self._weights = ((W + W.T) * 0.25).tocsr()
+        self._bias = b
+        self._constant = constant_term
+
+    def add_inequality_constraints_matrix(self, constraint_mask, constraint_bounds):
+        mask = csr_array(constraint_mask, dtype=np.float64)
+        bounds = np.asarray(constraint_bounds, dtype=np.float64).reshape(-1, 2)
+        if mask.shape[1] != self._size or mask.shape[0] != bounds.shape[0]:
+            raise ValueError("Constraint shapes do not match the variable vector")
+        if self._mask is None:
+            self._mask, self._bounds = mask, bounds
+        else:
+            self._mask = vstack([self._mask, mask]).tocsr()
+            self._bounds = np.vstack([self._bounds, bounds])
+
+    def objective(self, states) -> np.ndarray:
+        """
+        Objective value 1/2 x^T W x + b^T x + constant (as reported by
+        optimize) of each row of `states`.
+        """
+        X = np.atleast_2d(np.asarray(states, dtype=np.float64))
+        return (X * (self._weights @ X.T).T).sum(axis=1) + X @ self._bias + self._constant
+
+    def _auto_penalty(self) -> float:
+        # Largest objective change a single flip can cause: a violated
+        # constraint then always costs more than any objective gain.
+        W = abs(self._weights)
+        row_sums = np.asarray(W.sum(axis=1)).ravel()
+        return float(np.max(np.abs(self._bias) + 2 * row_sums, initial=0.0)) + 1.0
+
+    def optimize(self, *, beta: List[float], timeout_in_secs: float = 10.0, num_chains: int = 8,
+                 num_engines: int = 1, coupling_mult: float = 0.5, penalty_scaling: Optional[float] = None,
+                 max_sweeps: Optional[int] = None, initial_state=None, **kwargs) -> LocalOptimizeResponse:
+        """
+        Run parallel tempering for `timeout_in_secs` (or `max_sweeps` sweeps,
+        or until a streaming caller asks to stop).
+        Accepts the titanq.Model.optimize arguments; coupling_mult and the
+        hardware-specific options (precision, num_buckets, ...) have no
+        meaning for the local sampler and are ignored.
+        initial_state: optional (k, size) binary warm-start states; replica r
+        starts from state r % k instead of a random one.
+        """
+        if self._weights is None:
+            raise ValueError("Set the objective before calling optimize")
+        betas = np.asarray(beta, dtype=np.float64)
+        if betas.size != num_chains:
+            raise ValueError(f"Expected {num_chains} beta values, got {betas.size}")
+        if initial_state is not None:
+            initial_state = np.atleast_2d(np.asarray(initial_state, dtype=np.float64))
+            if initial_state.shape[1] != self._bias.size:
+                raise ValueError(f"Initial states must have {self._bias.size} variables, got {initial_state.shape[1]}")
+
+        penalty = self._auto_penalty() if penalty_scaling is None else float(penalty_scaling)
+        rng = np.random.default_rng(self.seed)
+        results, energies, metrics = _parallel_tempering(
+            self._weights, self._bias, self._mask, self._bounds, betas, num_engines,
+            timeout_in_secs, penalty, rng, max_sweeps, initial_state,
+        )
+        metrics["penalty"] = penalty
+        return LocalOptimizeResponse(results, energies + self._constant, metrics)
+
+def _parallel_tempering(W: csr_array, b: np.ndarray, mask: Optional[csr_array], bounds: Optional[np.ndarray],
+                        betas: np.ndarray, engines: int, timeout: float, penalty: float,
+                        rng: np.random.Generator, max_sweeps: Optional[int], initial: Optional[np.ndarray] = None):
+    start_time = time.perf_counter()
+    size = b.size
+    chains = betas.size
+    replicas = engines * chains
+    replica_beta = np.tile(betas, engines)
+
+    if mask is None:
+        mask = csr_array((0, size), dtype=np.float64)
+        bounds = np.zeros((0, 2))
+    lo, hi = bounds[:, 0], bounds[:, 1]
+    mask_cols = mask.tocsc()
+    diag = W.diagonal()
+
+    # Random (or warm-start) initial states and their fields / constraint activities
+    X = (rng.random((replicas, size)) < 0.5).astype(np.float64)
+    if initial is not None:
+        X[:] = initial[np.arange(replicas) % initial.shape[0]]
+    H = (W @ X.T).T
+    S = (mask @ X.T).T
+    objective = (X * (H + b)).sum(axis=1)
+    energy = objective + penalty * (_violation(S, lo, hi) ** 2).sum(axis=1)
+
+    best_energy = np.full(engines, np.inf)
+    best_objective = np.zeros(engines)
+    best_state = np.zeros((engines, size))
+
+    def track_best():
+        # Keep the best (penalized) state of every engine
+        per_engine = energy.reshape(engines, chains)
+        best_in_engine = per_engine.argmin(axis=1)
+        candidate = per_engine[np.arange(engines), best_in_engine]
+        improved = np.flatnonzero(candidate < best_energy)
+        if improved.size:
+            src = improved * chains + best_in_engine[improved]
+            best_energy[improved] = candidate[improved]
+            best_objective[improved] = objective[src]
+            best_state[improved] = X[src]
+
+    # Warm-start states count as well, so the result is never worse than them
+    track_best()
+    sweeps, exchanges_tried, exchanges_accepted = 0, 0, 0
+    while True:
+        u = rng.random((size, replicas))
+        interrupted = False
+        for i in range(size):
+            # A sweep over a large problem can outlast the budget; check it within the sweep too
+            if i % 256 == 255 and (time.perf_counter() - start_time >= timeout or stop_requested()):
+                interrupted = True
+                break
+            cols = W.indices[W.indptr[i]:W.indptr[i + 1]]
+            vals = W.data[W.indptr[i]:W.indptr[i + 1]]
+            rows = mask_cols.indices[mask_cols.indptr[i]:mask_cols.indptr[i + 1]]
+            coefs = mask_cols.data[mask_cols.indptr[i]:mask_cols.indptr[i + 1]]
+
+            xi = X[:, i]
+            d = 1.0 - 2.0 * xi
+            d_obj = d * (b[i] + diag[i] + 2.0 * (H[:, i] - diag[i] * xi))
+            delta = d_obj
+            if rows.size:
+                s_old = S[:, rows]
+                s_new = s_old + d[:, None] * coefs
+                d_pen = (_violation(s_new, lo[rows], hi[rows]) ** 2 - _violation(s_old, lo[rows], hi[rows]) ** 2).sum(axis=1)
+                delta = d_obj + penalty * d_pen
+
+            accept = u[i] < np.exp(-replica_beta * np.maximum(delta, 0.0))
+            flip = np.flatnonzero(accept)
+            if flip.size:
+                X[flip, i] = 1.0 - xi[flip]
+                if cols.size:
+                    H[np.ix_(flip, cols)] += d[flip, None] * vals
+                if rows.size:
+                    S[np.ix_(flip, rows)] = s_new[flip]
+                objective[flip] += d_obj[flip]
+                energy[flip] += delta[flip]
+        sweeps += 1
+        track_best()
+        if interrupted:
+            break
+
+        # Replica exchange between neighbouring temperatures (even/odd pairs alternate)
+        first = np.arange(sweeps % 2, chains - 1, 2)
+        if first.size:
+            e = energy.reshape(engines, chains)
+            log_ratio = (betas[first] - betas[first + 1]) * (e[:, first] - e[:, first + 1])
+            swap = rng.random(log_ratio.shape) < np.exp(np.minimum(log_ratio, 0.0))
+            exchanges_tried += swap.size
+            exchanges_accepted += int(swap.sum())
+            engine_idx, pair_idx = np.nonzero(swap)
+            if engine_idx.size:
+                perm = np.arange(replicas)
+                a = engine_idx * chains + first[pair_idx]
+                perm[a], perm[a + 1] = a + 1, a
+                X, H, S = X[perm], H[perm], S[perm]
+                objective, energy = objective[perm], energy[perm]
+
+        if time.perf_counter() - start_time >= timeout or (max_sweeps is not None and sweeps >= max_sweeps):
+            break
+        if stop_requested():
+            break
+
+    metrics = {
+        "sweeps": sweeps,
+        "replicas": replicas,
+        "exchange_acceptance": exchanges_accepted / exchanges_tried if exchanges_tried else 0.0,
+        "solve_time": time.perf_counter() - start_time,
+    }
+    return best_state.astype(np.float32), best_objective, metrics
+
+def sampler_backend(params) -> str:
+    return (getattr(params, "sampler", None) or os.environ.get("QUBO_SAMPLER", "titanq")).lower()
+
+# Floor of the sampler budget, so a nearly spent deadline still returns a sample
+MIN_SAMPLER_TIME = 0.1
+
+@contextmanager
+def sampler_call(params, n: int, m: int, backend: Optional[str] = None) -> Iterator[float]:
+    """
+    Run one sampler call as the "sampler" phase and yield its time budget:
+    what is left of the request deadline after reserving the estimated
+    decode, repair and makespan cost, the polishing slice and the backend's
+    call overhead. Time spent beyond the budget is learned as that overhead
+    for the next calls.
+    """
+    backend = backend or sampler_backend(params)
+    deadline = current_deadline(params.timeout)
+    reserve = (cost_model.estimate("decode", n, m) + cost_model.estimate("repair", n, m)
+               + cost_model.estimate("makespan", n, m) + cost_model.overhead(backend)
+               + (getattr(params, "polish_fraction", 0.0) or 0.0) * params.timeout)
+    budget = deadline.budget_for(reserve, MIN_SAMPLER_TIME)
+    start = time.perf_counter()
+    with phase("sampler"):
+        yield budget
+    cost_model.observe_overhead(backend, time.perf_counter() - start - budget)
+
+def create_model(params):
+    """
+    Sampler selected by params.sampler, falling back to the QUBO_SAMPLER
+    environment variable: "titanq" (default, remote) or "local" (in-process
+    parallel tempering, seeded by params.seed).
+    """
+    backend = sampler_backend(params)
+    if backend == "local":
+        return ParallelTemperingModel(seed=getattr(params, "seed", None))
+    if backend == "titanq":
+        from titanq import Model
+        return Model(api_key=os.environ.get("TITANQ_API_KEY", "Your API Key"))
+    raise ValueError(f"Unknown sampler '{backend}', expected one of {SAMPLERS}")
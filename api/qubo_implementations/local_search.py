@@ -0,0 +1,156 @@
+import time
+import numpy as np
+from typing import List, Optional, Tuple
+
+from .evaluator import batch_makespan
+from .insertion import heads, tails, insertion_makespans
+
+__all__ = ['NEIGHBOURHOODS', 'STRATEGIES', 'local_search']
+
+NEIGHBOURHOODS = ("swap", "insertion")
+STRATEGIES = ("first", "best", "dlb")
+
+# Minimum gain for a move to count as improving; guards against accepting
+# moves whose only gain is floating-point noise from the prefix-scan kernels.
+_MIN_GAIN = 1e-9
+
+class _MoveEvaluator:
+    """
+    Scores every move anchored at one position of the current sequence.
+    Head (e) and tail (q) completion times of the current sequence are cached,
+    so a move is only re-simulated on the segment it actually changes:
+      - swap (i, j): positions min(i, j)..max(i, j), starting from the cached
+        prefix heads and closed with the cached suffix tails
+      - insertion of the job at i: Taillard sweep over all n positions
+    """
+
+    def __init__(self, seq: List[int], p: np.ndarray, neighbourhood: str):
+        self.p = p
+        self.neighbourhood = neighbourhood
+        self.seq = np.asarray(seq, dtype=np.intp)
+        self.refresh()
+
+    def refresh(self):
+        ps = self.p[self.seq]
+        m = self.p.shape[1]
+        self.e = heads(ps)
+        self.q = np.vstack([tails(ps), np.zeros((1, m))])
+        self.makespan = float(self.e[-1, -1])
+
+    def moves(self, i: int, all_partners: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Moves anchored at position i as (targets, makespans).
+        For swaps only partners after i are returned unless all_partners is set.
+        """
+        n = len(self.seq)
+        if self.neighbourhood == "insertion":
+            rest = np.delete(self.seq, i).tolist()
+            mks = insertion_makespans(rest, int(self.seq[i]), self.p)
+            targets = np.delete(np.arange(n), i)
+            return targets, mks[targets]
+
+        partners = np.delete(np.arange(n), i) if all_partners else np.arange(i + 1, n)
+        if partners.size == 0:
+            return partners, np.empty(0)
+        lo = min(i, int(partners.min()))
+        hi = max(i, int(partners.max()))
+        rows = np.arange(partners.size)
+        segment = np.tile(self.seq[lo:hi + 1], (partners.size, 1))
+        segment[rows, i - lo] = self.seq[partners]
+        segment[rows, partners - lo] = self.seq[i]
+        start = self.e[lo - 1] if lo > 0 else None
+        _, completion = batch_makespan(segment, self.p, return_completion=True, start=start)
+        ends = np.maximum(partners, i)
+        mks = (completion[rows, ends - lo] + self.q[ends + 1]).max(axis=1)
+        return partners, mks
+
+    def apply(self, i: int, target: int) -> List[int]:
+        """
+        Apply a move and return the jobs whose placement changed.
+        """
+        if self.neighbourhood == "insertion":
+            job = self.seq[i]
+            self.seq = np.insert(np.delete(self.seq, i), target, job)
+        else:
+            self.seq[[i, target]] = self.seq[[target, i]]
+        self.refresh()
+        lo, hi = min(i, target), max(i, target)
+        return self.seq[max(lo - 1, 0):hi + 2].tolist()
+
+def local_search(seq: List[int], p, neighbourhood: str = "swap", strategy: str = "first",
+                 time_limit: Optional[float] = None) -> Tuple[List[int], float]:
+    """
+    Descent over the swap or insertion neighbourhood until a local optimum.
+    strategy:
+      - "first": scan positions in order and accept the first improving move
+        (the scan continues from the current position instead of restarting)
+      - "best": evaluate the whole neighbourhood and apply the best move
+      - "dlb": don't-look bits; a job is only re-examined after a move
+        changed its surroundings. Once no bit is left, one pass with all
+        bits set confirms the local optimum
+    time_limit: optional wall-clock budget in seconds
+    Returns (sequence, makespan).
+    """
+    if neighbourhood not in NEIGHBOURHOODS:
+        raise ValueError(f"Unknown neighbourhood '{neighbourhood}', expected one of {NEIGHBOURHOODS}")
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}', expected one of {STRATEGIES}")
+
+    p = np.asarray(p, dtype=np.float64)
+    if len(seq) < 2:
+        mk = float(batch_makespan(np.asarray(seq, dtype=np.intp)[None, :], p)[0])
+        return list(seq), mk
+
+    start_time = time.perf_counter()
+    def out_of_time():
+        return time_limit is not None and time.perf_counter() - start_time > time_limit
+
+    ev = _MoveEvaluator(seq, p, neighbourhood)
+    n = len(ev.seq)
+
+    if strategy == "first":
+        clean_streak, i = 0, 0
+        while clean_streak < n and not out_of_time():
+            targets, mks = ev.moves(i, all_partners=neighbourhood == "insertion")
+            better = np.flatnonzero(mks < ev.makespan - _MIN_GAIN)
+            if better.size:
+                ev.apply(i, int(targets[better[0]]))
+                clean_streak = 0
+            else:
+                clean_streak += 1
+                i = (i + 1) % n
+
+    elif strategy == "best":
+        while not out_of_time():
+            best_move, best_mk = None, ev.makespan
+            for i in range(n):
+                targets, mks = ev.moves(i, all_partners=neighbourhood == "insertion")
+                if mks.size and mks.min() < best_mk - _MIN_GAIN:
+                    k = int(np.argmin(mks))
+                    best_move, best_mk = (i, int(targets[k])), float(mks[k])
+            if best_move is None:
+                break
+            ev.apply(*best_move)
+
+    else:  # dlb
+        look = np.ones(p.shape[0], dtype=bool)
+        confirming = False
+        while not out_of_time():
+            pending = [i for i, job in enumerate(ev.seq) if look[job]]
+            if not pending:
+                # A move can open one for a job whose bit was already cleared
+                if confirming:
+                    break
+                look[:] = True
+                confirming = True
+                continue
+            i = pending[0]
+            targets, mks = ev.moves(i)
+            k = int(np.argmin(mks))
+            if mks[k] < ev.makespan - _MIN_GAIN:
+                look[ev.apply(i, int(targets[k]))] = True
+                confirming = False
+            else:
+                look[ev.seq[i]] = False
+
+    return ev.seq.tolist(), ev.makespan
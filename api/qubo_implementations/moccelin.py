@@ -1,76 +1,39 @@
 import numpy as np
-from titanq import Model, Vtype, Target
 import time
 
-def UBX(K, u, v, pik, memo):
-    if K == 1: return 0
-    if (K,u,v) in memo: return memo[(K,u,v)]
-    prev = UBX(K-1, u, v, pik, memo)
-    memo[(K,u,v)] = max(0, prev + (pik[u][K-2] - pik[v][K-1]))
-    return memo[(K,u,v)]
+from .distances import d4_matrix
+from .local_sampler import create_model, sampler_call
+from .qubo import Qubo
+from .qubo_builder import create_adjacency_qubo
+from .qubo_cache import instance_key, qubo_cache
+from .repair import SAMPLE_FIELDS, postprocess
+from .timing import phase, record_size
+from .warm_start import warm_start_kwargs, with_seeds
 
 def create_qubo(dmat, n, penalty=2.0):
-    size = n * n
-    W = np.zeros((size, size), dtype=np.float32)
-    b = np.zeros(size, dtype=np.float32)
+    return create_adjacency_qubo(dmat, n, penalty)
 
-    # objective weights
-    for i in range(n):
-        for j in range(n):
-            if i == j: continue
-            for p_pos in range(n - 1):
-                W[i*n + p_pos, j*n + p_pos + 1] += dmat[i][j]
-
-    # bias on last position of each job
-    for i in range(n):
-        b[i*n + (n - 1)] += penalty
-
-    # constraints: each job exactly once, each position exactly one job
-    CW = np.zeros((2*n, size), dtype=np.float32)
-    CB = np.zeros((2*n, 2), dtype=np.float32)
-
-    # job→position
-    for i in range(n):
-        for p_pos in range(n):
-            CW[i, i*n + p_pos] = 1
-        CB[i] = [1 - 1e-1, 1 + 1e-1]
-
-    # position→job
-    for p_pos in range(n):
-        for i in range(n):
-            CW[n + p_pos, i*n + p_pos] = 1
-        CB[n + p_pos] = [1 - 1e-1, 1 + 1e-1]
-
-    return W, b, CW, CB
-
-def calculate_makespan(vec, n, m, pik):
-    order = [idx % n for idx, v in enumerate(vec) if v]
-    machine_end = [0]*m
-    job_end = [0]*n
-    for job in order:
-        for k in range(m):
-            start = machine_end[k] if k == 0 else max(job_end[job], machine_end[k])
-            end = start + pik[job][k]
-            job_end[job], machine_end[k] = end, end
-    return machine_end[-1]
+def build_qubo(pik, n, m):
+    """Qubo (canonical symmetric form) ready for the sampler"""
+    # Calculate distance matrix d4
+    with phase("distances"):
+        d4 = d4_matrix(pik)
+    W, b, CW, CB = create_qubo(d4, n)
+    return Qubo.from_matrix(W, b, constraint_weights=CW, constraint_bounds=CB)
 
 def solve_with_mocellin_qubo(job_matrix, params):
-    start_time = time.time()
+    start_time = time.perf_counter()
     n = job_matrix.jobs
     m = job_matrix.machines
     pik = job_matrix.processing_times
 
-    # Calculate distance matrix d4
-    d4 = [[UBX(m, i, j, pik, {}) for j in range(n)] for i in range(n)]
+    # Create QUBO matrices (reused across requests for the same instance)
+    qubo = qubo_cache.get_or_build(instance_key(pik, "mocellin"), lambda: build_qubo(pik, n, m))
+    record_size(variables=qubo.size, qubo_nnz=qubo.nnz, constraints=qubo.constraint_weights.shape[0])
 
     # Initialize model
-    model = Model(api_key="Your API Key")
-
-    # Create QUBO matrices
-    W, b, CW, CB = create_qubo(d4, n)
-    model.add_variable_vector("x", size=n*n, vtype=Vtype.BINARY)
-    model.set_objective_matrices(0.5*(W+W.T), b, Target.MINIMIZE)
-    model.add_inequality_constraints_matrix(CW, CB)
+    with phase("sampler_setup"):
+        model = qubo.to_model(create_model(params))
 
     # Optimization parameters
     beta = (1.0/np.geomspace(params.T_min, params.T_max, params.num_chains)).tolist()
@@ -78,37 +41,30 @@ def solve_with_mocellin_qubo(job_matrix, params):
     # Get coupling multiplier parameter (default to 0.4 if not provided)
     coupling_multiplier = getattr(params, 'coupling_multiplier', 0.4)
     
-    # Solve the model
-    results = model.optimize(
-        beta=beta,
-        timeout_in_secs=params.timeout,
-        num_engines=params.num_engines,
-        num_chains=params.num_chains,
-        coupling_mult=coupling_multiplier  # Add this line
-    )
-
-    # Find best solution
-    lowest_energy = None
-    best_solution = None
-
-    for energy, solution in results.result_items():
-        if lowest_energy is None or energy < lowest_energy:
-            lowest_energy = energy
-            best_solution = solution
-
-    # Extract job sequence
-    job_sequence = [
-        index % n + 1  # Add 1 to make it 1-based indexing
-        for index, value in enumerate(best_solution)
-        if value == 1
-    ]
-# At the end of the function:
-    execution_time = time.time() - start_time
+    # Optionally start the chains from NEH / known schedules
+    warm_start = warm_start_kwargs(model, pik, params)
+
+    # The sampler gets what is left of the request deadline after the build
+    with sampler_call(params, n, m) as timeout:
+        results = model.optimize(
+            beta=beta,
+            timeout_in_secs=timeout,
+            num_engines=params.num_engines,
+            num_chains=params.num_chains,
+            coupling_mult=coupling_multiplier,  # Add this line
+            **warm_start
+        )
+
+    # Every sample decoded and scored by makespan; the best schedule is polished
+    schedule = postprocess(with_seeds(results.result_items(), model, warm_start), pik, params)
+    
+    execution_time = time.perf_counter() - start_time
     
     return {
-        "sequence": job_sequence,
-        "makespan": calculate_makespan(best_solution, n, m, pik),
-        "energy": float(lowest_energy),
-        "execution_time": execution_time,  # Add the actual execution time
-        "solution": [int(x) for x in best_solution]  # Convert to regular Python list of integers
+        "sequence": [j + 1 for j in schedule["sequence"]],  # 1-based for the frontend
+        "makespan": schedule["makespan"],
+        "energy": schedule["energy"],
+        "execution_time": execution_time,
+        "solution": schedule["solution"],
+        **{key: schedule[key] for key in SAMPLE_FIELDS}
     }
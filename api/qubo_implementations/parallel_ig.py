@@ -0,0 +1,126 @@
+import os
+import time
+import random
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .classical_solver import ig_iteration
+from .evaluator import sequence_makespan
+
+__all__ = ['parallel_iterated_greedy']
+
+# Shared incumbent handed to each pool process by the initializer
+_worker_state: Dict[str, Any] = {}
+
+def _init_worker(p, best_mk, best_seq, target):
+    _worker_state["p"] = p
+    _worker_state["best_mk"] = best_mk
+    _worker_state["best_seq"] = best_seq
+    _worker_state["target"] = target
+
+def _publish(seq: List[int], mk: float) -> bool:
+    """
+    Store (seq, mk) as the shared incumbent if it beats the current one.
+    """
+    best_mk, best_seq = _worker_state["best_mk"], _worker_state["best_seq"]
+    with best_mk.get_lock():
+        if mk < best_mk.value:
+            best_mk.value = mk
+            best_seq[:] = seq
+            return True
+    return False
+
+def _read_incumbent() -> Tuple[List[int], float]:
+    best_mk, best_seq = _worker_state["best_mk"], _worker_state["best_seq"]
+    with best_mk.get_lock():
+        return list(best_seq[:]), best_mk.value
+
+def _run_worker(worker_id: int, seed: int, seq: List[int], k_remove: int, iterations: int, time_limit: float,
+                neighbourhood: str, strategy: str, patience: int) -> Tuple[List[int], float, Dict[str, Any]]:
+    """
+    Independent IG run with its own RNG. After `patience` iterations without
+    improving its own current solution, a worker that is behind the shared
+    incumbent restarts from it. All workers stop once the shared incumbent
+    reaches the target (the instance's lower bound).
+    """
+    start_time = time.perf_counter()
+    rng = random.Random(seed)
+    p = _worker_state["p"]
+
+    current_seq = seq[:]
+    current_mk = sequence_makespan(current_seq, p)
+    best_seq, best_mk = current_seq[:], current_mk
+    stats = {"worker": worker_id, "seed": seed, "iterations": 0, "improvements": 0, "published": 0, "restarts": 0}
+
+    target = _worker_state["target"]
+    stale = 0
+    for _ in range(iterations):
+        elapsed = time.perf_counter() - start_time
+        if elapsed > time_limit:
+            break
+        if target is not None and _worker_state["best_mk"].value <= target:
+            break
+
+        temp_seq, temp_mk = ig_iteration(current_seq, p, k_remove, rng, neighbourhood, strategy,
+                                         time_limit=time_limit - elapsed)
+        stats["iterations"] += 1
+
+        if temp_mk < current_mk:
+            current_seq, current_mk = temp_seq, temp_mk
+            stale = 0
+            if temp_mk < best_mk:
+                best_seq, best_mk = temp_seq[:], temp_mk
+                stats["improvements"] += 1
+                if _publish(best_seq, best_mk):
+                    stats["published"] += 1
+        else:
+            stale += 1
+
+        if stale >= patience and _worker_state["best_mk"].value < current_mk:
+            current_seq, current_mk = _read_incumbent()
+            stats["restarts"] += 1
+            stale = 0
+
+    stats["best_makespan"] = best_mk
+    stats["elapsed"] = time.perf_counter() - start_time
+    return best_seq, best_mk, stats
+
+def parallel_iterated_greedy(seq: List[int], pik, k_remove: int, iterations: int, max_time: float, workers: int,
+                             seed: Optional[int] = None, neighbourhood: str = "swap", strategy: str = "first",
+                             patience: int = 50, target: Optional[float] = None) -> Tuple[List[int], float, List[Dict[str, Any]]]:
+    """
+    Multi-start iterated greedy on a process pool:
+      - every worker runs IG from `seq` with its own seed (seed + worker id)
+      - the best makespan/sequence is kept in shared memory; workers publish
+        improvements to it and restart from it when they fall behind
+      - every worker stops after `iterations` iterations or `max_time` seconds,
+        or as soon as the best makespan reaches `target`
+    Returns (best sequence, best makespan, per-worker statistics).
+    """
+    p = np.asarray(pik, dtype=np.float64)
+    workers = max(1, min(workers, os.cpu_count() or 1))
+    if seed is None:
+        seed = random.randrange(2**31)
+
+    ctx = mp.get_context()
+    start_mk = sequence_makespan(seq, p)
+    best_mk = ctx.Value('d', start_mk)
+    best_seq = ctx.Array('i', seq, lock=False)
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(p, best_mk, best_seq, target)) as pool:
+        futures = [
+            pool.submit(_run_worker, w, seed + w, seq, k_remove, iterations, max_time,
+                        neighbourhood, strategy, patience)
+            for w in range(workers)
+        ]
+        results = [f.result() for f in futures]
+
+    final_seq, final_mk = seq[:], start_mk
+    for worker_seq, worker_mk, _ in results:
+        if worker_mk < final_mk:
+            final_seq, final_mk = worker_seq, worker_mk
+    return final_seq, final_mk, [stats for _, _, stats in results]
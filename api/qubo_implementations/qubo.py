@@ -0,0 +1,177 @@
+import os
+import json
+import numpy as np
+from scipy.sparse import csr_array, issparse
+from typing import Any, Dict, Optional
+
+from .local_sampler import ParallelTemperingModel
+from .timing import phase
+
+__all__ = ['Qubo']
+
+def _canonical_weights(Q):
+    """
+    Symmetric part of Q without its diagonal, as float32 CSR (sparse input)
+    or a C-contiguous float32 array (dense input); plus the diagonal.
+    """
+    if issparse(Q):
+        Q = csr_array(Q, dtype=np.float64)
+        diag = Q.diagonal()
+        W = ((Q + Q.T) * 0.5).tocsr()
+        W.setdiag(0)
+        W.eliminate_zeros()
+        return W.astype(np.float32), diag
+    Q = np.asarray(Q, dtype=np.float64)
+    diag = Q.diagonal().copy()
+    W = (Q + Q.T) * 0.5
+    np.fill_diagonal(W, 0.0)
+    return np.ascontiguousarray(W, dtype=np.float32), diag
+
+class Qubo:
+    """
+    One binary quadratic problem:
+      minimize  x^T W x + b^T x + offset  subject to  lo <= C x <= hi
+    Conventions: W is symmetric with an empty diagonal (x_i^2 = x_i, so
+    diagonal terms live in b), stored as float32 CSR, or as a C-contiguous
+    float32 array for dense problems; b is float32 (N,), C float32 CSR
+    (K, N) and the bounds float32 (K, 2). Constraints are optional; they
+    are passed to samplers that support them (TitanQ, local) and left out
+    of `explicit()`. The objective above is the energy itself: samplers
+    that minimize 1/2 x^T W x + b^T x (TitanQ and the local sampler) get
+    2W from `to_model`, explicit-matrix samplers Q from `explicit()`.
+
+    Instances are shared through the QUBO cache, memory-mapped from disk
+    and handed to samplers without copies, so they must not be modified.
+    """
+
+    def __init__(self, weights, bias, offset: float = 0.0, constraint_weights=None, constraint_bounds=None):
+        # Takes arrays in canonical form; use from_matrix for anything else
+        self.weights = weights
+        self.bias = bias
+        self.offset = float(offset)
+        self.constraint_weights = constraint_weights
+        self.constraint_bounds = constraint_bounds
+
+    @classmethod
+    def from_matrix(cls, Q, bias=None, offset: float = 0.0, constraint_weights=None, constraint_bounds=None) -> "Qubo":
+        """
+        Canonical form of x^T Q x + bias^T x + offset for any square Q (upper
+        triangular, full or symmetric; dense or sparse): the off-diagonal
+        symmetric part becomes W and the diagonal moves into the linear term.
+        """
+        with phase("qubo_assembly"):
+            W, diag = _canonical_weights(Q)
+            b = diag if bias is None else diag + np.asarray(bias, dtype=np.float64).ravel()
+            if constraint_weights is not None:
+                constraint_weights = csr_array(constraint_weights, dtype=np.float32)
+                constraint_bounds = np.asarray(constraint_bounds, dtype=np.float32).reshape(-1, 2)
+            return cls(W, b.astype(np.float32), offset, constraint_weights, constraint_bounds)
+
+    @property
+    def size(self) -> int:
+        return self.bias.shape[0]
+
+    @property
+    def nnz(self) -> int:
+        return int(self.weights.nnz) if issparse(self.weights) else int(np.count_nonzero(self.weights))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self._arrays().values())
+
+    def energy(self, states) -> np.ndarray:
+        """
+        Objective value of each row of `states` (constraints not included).
+        """
+        X = np.atleast_2d(np.asarray(states, dtype=np.float64))
+        WX = (self.weights @ X.T).T
+        return (X * WX).sum(axis=1) + X @ self.bias + self.offset
+
+    def to_model(self, model, name: str = "x", target=None):
+        """
+        Load the problem into a sampler model (titanq.Model or the local
+        ParallelTemperingModel). Both minimize 1/2 x^T W x + b^T x, so the
+        couplings are sent doubled and the sampler's energies equal
+        `energy()`; a purely linear problem is sent without a weight matrix.
+        """
+        if isinstance(model, ParallelTemperingModel):
+            # The local sampler takes plain names, so titanq is not imported for it
+            vtype, minimize = "BINARY", "MINIMIZE"
+        else:
+            from titanq import Target, Vtype
+            vtype, minimize = Vtype.BINARY, Target.MINIMIZE
+        model.add_variable_vector(name, size=self.size, vtype=vtype)
+        weights = self.weights * np.float32(2.0) if self.nnz else None
+        model.set_objective_matrices(weights, self.bias, target or minimize, constant_term=self.offset)
+        if self.constraint_weights is not None:
+            model.add_inequality_constraints_matrix(self.constraint_weights, self.constraint_bounds)
+        return model
+
+    def explicit(self) -> np.ndarray:
+        """
+        Dense upper-triangular Q with x^T Q x = x^T W x + b^T x, for samplers
+        that take a single QUBO matrix (qbsolv); the offset stays separate.
+        """
+        W = self.weights.toarray() if issparse(self.weights) else self.weights
+        Q = np.triu(W.astype(np.float64) * 2.0, k=1)
+        Q[np.diag_indices_from(Q)] = self.bias
+        return Q
+
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {"bias": self.bias, "offset": np.asarray(self.offset)}
+        for name in ("weights", "constraint_weights"):
+            matrix = getattr(self, name)
+            if matrix is None:
+                continue
+            if issparse(matrix):
+                arrays[f"{name}_data"] = matrix.data
+                arrays[f"{name}_indices"] = matrix.indices
+                arrays[f"{name}_indptr"] = matrix.indptr
+                arrays[f"{name}_shape"] = np.asarray(matrix.shape, dtype=np.int64)
+            else:
+                arrays[name] = matrix
+        if self.constraint_bounds is not None:
+            arrays["constraint_bounds"] = self.constraint_bounds
+        return arrays
+
+    def save(self, path: str):
+        """
+        Write to `path`: a single .npz archive, or (any other path) a
+        directory of .npy files that `load` can memory-map.
+        """
+        arrays = self._arrays()
+        if path.endswith(".npz"):
+            np.savez(path, **arrays)
+            return
+        os.makedirs(path, exist_ok=True)
+        for key, array in arrays.items():
+            np.save(os.path.join(path, f"{key}.npy"), array)
+        with open(os.path.join(path, "qubo.json"), "w") as f:
+            json.dump({"arrays": sorted(arrays)}, f)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = None) -> "Qubo":
+        """
+        Read a QUBO written by `save`. With mmap_mode="r" the arrays of a
+        directory are memory-mapped, so worker processes loading the same
+        QUBO share its pages instead of each holding a copy.
+        """
+        if path.endswith(".npz"):
+            with np.load(path) as archive:
+                arrays: Dict[str, Any] = {key: archive[key] for key in archive.files}
+        else:
+            with open(os.path.join(path, "qubo.json")) as f:
+                names = json.load(f)["arrays"]
+            arrays = {key: np.load(os.path.join(path, f"{key}.npy"), mmap_mode=mmap_mode) for key in names}
+
+        def matrix(name):
+            if name in arrays:
+                return arrays[name]
+            if f"{name}_data" not in arrays:
+                return None
+            shape = tuple(int(v) for v in arrays[f"{name}_shape"])
+            return csr_array((arrays[f"{name}_data"], arrays[f"{name}_indices"], arrays[f"{name}_indptr"]),
+                             shape=shape, copy=False)
+
+        return cls(matrix("weights"), arrays["bias"], float(arrays["offset"]),
+                   matrix("constraint_weights"), arrays.get("constraint_bounds"))
@@ -0,0 +1,77 @@
+from functools import lru_cache
+
+import numpy as np
+from scipy.sparse import coo_array, csr_array
+from typing import Tuple
+
+from .timing import phase
+
+__all__ = [
+    'ADJACENCY_SCALE',
+    'adjacency_objective',
+    'last_position_bias',
+    'assignment_constraints',
+    'create_adjacency_qubo',
+]
+
+# Variable layout shared by the distance-based formulations:
+#   x[i*n + p] = 1  <=>  job i is at position p
+
+# Weight of the distance objective against the last-position penalty and
+# the assignment constraints: the formulations were tuned with the
+# symmetrized distance couplings sent to TitanQ, which minimizes
+# 1/2 x^T W x + b^T x, so the distances entered the energy halved.
+ADJACENCY_SCALE = 0.5
+
+def adjacency_objective(dmat, n: int, dtype=np.float32) -> csr_array:
+    """
+    Position-adjacency couplings W[i*n + p, j*n + p + 1] = dmat[i][j] for every
+    ordered pair of distinct jobs (i, j) and every position p < n - 1.
+    Built in bulk as COO triplets; only the O(n^3) non-zeros are stored.
+    """
+    size = n * n
+    d = np.asarray(dmat, dtype=dtype)
+    jobs_i, jobs_j = np.nonzero(~np.eye(n, dtype=bool))
+    pos = np.arange(n - 1)
+    rows = (jobs_i[:, None] * n + pos).ravel()
+    cols = (jobs_j[:, None] * n + pos + 1).ravel()
+    data = np.repeat(d[jobs_i, jobs_j], n - 1)
+    return coo_array((data, (rows, cols)), shape=(size, size), dtype=dtype).tocsr()
+
+def last_position_bias(n: int, penalty: float = 2.0) -> np.ndarray:
+    """
+    Linear bias `penalty` on the last position of each job.
+    """
+    b = np.zeros(n * n, dtype=np.float32)
+    b[np.arange(n) * n + (n - 1)] = penalty
+    return b
+
+@lru_cache(maxsize=32)
+def assignment_constraints(n: int, tolerance: float = 1e-1) -> Tuple[csr_array, np.ndarray]:
+    """
+    Each job exactly once (rows 0..n-1) and each position exactly one job
+    (rows n..2n-1), as a sparse (2n, n*n) mask with bounds 1 +/- tolerance.
+    Depends on n only, so it is built once per size and shared by every
+    instance and formulation; callers must not modify it.
+    """
+    size = n * n
+    var = np.arange(size)
+    job_rows = var // n
+    pos_rows = n + var % n
+    rows = np.concatenate([job_rows, pos_rows])
+    cols = np.concatenate([var, var])
+    CW = coo_array((np.ones(2 * size, dtype=np.float32), (rows, cols)), shape=(2 * n, size)).tocsr()
+    CB = np.tile(np.array([1 - tolerance, 1 + tolerance], dtype=np.float32), (2 * n, 1))
+    return CW, CB
+
+def create_adjacency_qubo(dmat, n: int, penalty: float = 2.0) -> Tuple[csr_array, np.ndarray, csr_array, np.ndarray]:
+    """
+    QUBO of a distance-based (TSP-like) formulation: returns (W, b, CW, CB)
+    for the energy x^T W x + b^T x, with W the distance couplings scaled by
+    ADJACENCY_SCALE, upper-triangular in the position order
+    (Qubo.from_matrix symmetrizes it).
+    """
+    with phase("qubo_assembly"):
+        CW, CB = assignment_constraints(n)
+        W = adjacency_objective(dmat, n) * np.float32(ADJACENCY_SCALE)
+        return W, last_position_bias(n, penalty), CW, CB
@@ -0,0 +1,193 @@
+import os
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import issparse
+
+from .qubo import Qubo
+
+__all__ = ['instance_key', 'artifact_nbytes', 'QuboCache', 'qubo_cache']
+
+logger = logging.getLogger(__name__)
+
+def instance_key(pik, qubo_type: str) -> str:
+    """
+    Content hash of an instance for a given formulation: SHA-256 over the
+    shape and float64 bytes of the processing times plus the qubo_type.
+    """
+    p = np.ascontiguousarray(pik, dtype=np.float64)
+    h = hashlib.sha256()
+    h.update(qubo_type.encode())
+    h.update(np.asarray(p.shape, dtype=np.int64).tobytes())
+    h.update(p.tobytes())
+    return h.hexdigest()
+
+def _collect_buffers(value: Any, buffers: Dict[int, np.ndarray]) -> int:
+    """
+    Add the arrays held by a cached artifact to `buffers`, keyed by the id
+    of the array owning their memory, so views and re-wrapped sparse
+    matrices of one buffer are counted once. Returns the approximate bytes
+    of anything that is not an array.
+    """
+    if isinstance(value, Qubo):
+        value = value._arrays()
+    elif issparse(value):
+        value = [getattr(value, name) for name in ("data", "indices", "indptr", "row", "col")
+                 if hasattr(value, name)]
+    if isinstance(value, np.ndarray):
+        while isinstance(value.base, np.ndarray):
+            value = value.base
+        buffers[id(value)] = value
+        return 0
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(_collect_buffers(v, buffers) for v in value)
+    return 64
+
+def artifact_nbytes(value: Any) -> int:
+    """
+    Approximate memory held by cached QUBO artifacts (Qubo objects, arrays,
+    sparse matrices and tuples/lists/dicts of them), shared buffers once.
+    """
+    buffers: Dict[int, np.ndarray] = {}
+    other = _collect_buffers(value, buffers)
+    return other + sum(array.nbytes for array in buffers.values())
+
+class QuboCache:
+    """
+    Thread-safe LRU cache of built QUBO artifacts with a byte budget.
+    Least recently used entries are evicted until the new entry fits; an
+    entry larger than the whole budget is returned but not stored.
+    Cached artifacts are shared between callers and must not be mutated.
+    Buffers shared by several entries (e.g. the lru_cached assignment
+    constraints) are charged once, while any entry holding them is cached.
+
+    With a `store_dir`, Qubo artifacts are also written there on a miss
+    and memory-mapped from there by any process that misses later, so
+    workers of one deployment build each QUBO once and share its pages.
+    """
+
+    def __init__(self, max_bytes: int, store_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.store_dir = store_dir
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._entry_buffers: Dict[str, Tuple[int, ...]] = {}
+        # id -> [owning array, number of entries holding it]
+        self._buffers: Dict[int, List[Any]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "QuboCache":
+        return cls(int(os.environ.get("QUBO_CACHE_BYTES", 256 * 1024 * 1024)),
+                   os.environ.get("QUBO_STORE_DIR") or None)
+
+    def _load_stored(self, key: str) -> Optional[Any]:
+        if self.store_dir is None:
+            return None
+        path = os.path.join(self.store_dir, key)
+        if not os.path.isdir(path):
+            return None
+        try:
+            return Qubo.load(path, mmap_mode="r")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable stored QUBO %s: %s", path, e)
+            return None
+
+    def _store(self, key: str, value: Any):
+        if self.store_dir is None or not isinstance(value, Qubo):
+            return
+        path = os.path.join(self.store_dir, key)
+        try:
+            os.makedirs(self.store_dir, exist_ok=True)
+            # Written next to its final place and renamed, so readers never see a partial QUBO
+            tmp = tempfile.mkdtemp(dir=self.store_dir, prefix=".tmp-")
+            value.save(tmp)
+            try:
+                os.rename(tmp, path)
+            except OSError:
+                # Another worker stored it first
+                shutil.rmtree(tmp, ignore_errors=True)
+        except OSError as e:
+            logger.warning("Could not store QUBO %s: %s", path, e)
+
+    def get_or_build(self, key: str, build: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Load or build outside the lock so other instances are not serialized behind it
+        value = self._load_stored(key)
+        if value is None:
+            value = build()
+            self._store(key, value)
+        buffers: Dict[int, np.ndarray] = {}
+        other = _collect_buffers(value, buffers)
+        with self._lock:
+            if other + sum(array.nbytes for array in buffers.values()) > self.max_bytes \
+                    or key in self._entries:
+                return value
+            while self._bytes + self._new_bytes(other, buffers) > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._release(old_key)
+                self.evictions += 1
+            self._bytes += self._new_bytes(other, buffers)
+            for buffer_id, array in buffers.items():
+                self._buffers.setdefault(buffer_id, [array, 0])[1] += 1
+            self._entries[key] = value
+            self._sizes[key] = other
+            self._entry_buffers[key] = tuple(buffers)
+        return value
+
+    def _new_bytes(self, other: int, buffers: Dict[int, np.ndarray]) -> int:
+        # Bytes an entry adds on top of the buffers already held by the cache
+        return other + sum(array.nbytes for buffer_id, array in buffers.items()
+                           if buffer_id not in self._buffers)
+
+    def _release(self, key: str):
+        self._bytes -= self._sizes.pop(key)
+        for buffer_id in self._entry_buffers.pop(key):
+            held = self._buffers[buffer_id]
+            held[1] -= 1
+            if held[1] == 0:
+                self._bytes -= held[0].nbytes
+                del self._buffers[buffer_id]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._entry_buffers.clear()
+            self._buffers.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "store_dir": self.store_dir,
+            }
+
+# Process-wide cache used by every formulation
+qubo_cache = QuboCache.from_env()
@@ -0,0 +1,227 @@
+import sys
+import time
+import logging
+import importlib
+import importlib.util
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .local_sampler import sampler_backend
+
+__all__ = [
+    'HEAVY_PACKAGES', 'Formulation', 'register', 'register_backend', 'formulations',
+    'formulation_for', 'missing_packages', 'import_report', 'preload',
+]
+
+logger = logging.getLogger(__name__)
+
+# Optional third-party packages that only some solve paths need. They are
+# imported the first time such a path runs, not when the API starts.
+HEAVY_PACKAGES = ("titanq", "autoqubo", "dimod", "dwave_qbsolv", "sympy")
+
+def _assignment_bytes(n: int, couplings: int) -> int:
+    # float32 CSR couplings (data + int32 indices), indptr and bias of the n*n
+    # variables, plus the 2n assignment constraint rows of n entries each
+    N = n * n
+    return 8 * couplings + 4 * (N + 1) + 4 * N + 8 * 2 * n * n + 8 * 2 * n
+
+def _adjacency_bytes(n: int, m: int, params=None) -> int:
+    # Distance couplings between consecutive positions, both triangles
+    return _assignment_bytes(n, 2 * n * (n - 1) ** 2)
+
+def _auto_bytes(n: int, m: int, params=None) -> int:
+    # Adjacency couplings plus the penalty's row/column pairs
+    return _assignment_bytes(n, 2 * n * (n - 1) ** 2 + 2 * n * n * (n - 1))
+
+def _qbsolv_bytes(n: int, m: int, params=None) -> int:
+    # qbsolv takes the explicit dense float64 matrix on top of the cached QUBO
+    return _auto_bytes(n, m) + 8 * n ** 4
+
+def _window(n: int, params=None) -> int:
+    return max(2, min(getattr(params, "window_size", None) or 10, n))
+
+class Formulation:
+    """
+    A solve path selectable through SolverParams. Only the dotted path of its
+    solve function is known up front; the module (and whatever heavy
+    packages it imports) is loaded the first time the path is used.
+
+    variables(n, m, params) and memory(n, m, params) estimate the QUBO size
+    and the bytes its build holds; `requires` lists the packages the path
+    cannot run without (the sampler backend's are checked separately).
+    """
+
+    def __init__(self, name: str, module: str, function: str, requires: Tuple[str, ...] = (),
+                 variables: Optional[Callable[..., int]] = None, memory: Optional[Callable[..., int]] = None,
+                 uses_sampler: bool = True, params_as_dict: bool = False, description: str = ""):
+        self.name = name
+        self.module = module
+        self.function = function
+        self.requires = tuple(requires)
+        self.variables = variables or (lambda n, m, params=None: n * n)
+        self.memory = memory
+        self.uses_sampler = uses_sampler
+        self.params_as_dict = params_as_dict
+        self.description = description
+        self.import_time: Optional[float] = None
+        self._solve: Optional[Callable] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._solve is not None
+
+    def load_module(self):
+        return importlib.import_module(self.module, __package__)
+
+    def load(self) -> Callable:
+        """
+        The solve function, importing its module on first use.
+        """
+        if self._solve is None:
+            with self._lock:
+                if self._solve is None:
+                    start = time.perf_counter()
+                    solve = getattr(self.load_module(), self.function)
+                    self.import_time = time.perf_counter() - start
+                    logger.info("Loaded formulation %s in %.3fs", self.name, self.import_time)
+                    self._solve = solve
+        return self._solve
+
+    def requirements(self, params=None) -> Tuple[str, ...]:
+        # Without params: the default sampler backend (QUBO_SAMPLER, else titanq)
+        if self.uses_sampler:
+            return self.requires + _BACKENDS.get(sampler_backend(params), ())
+        return self.requires
+
+    def solve(self, job_matrix, params):
+        missing = missing_packages(self.requirements(params))
+        if missing:
+            raise ImportError(f"Solver {self.name} needs {', '.join(missing)}, which is not installed")
+        solve = self.load()
+        return solve(job_matrix, params.model_dump() if self.params_as_dict else params)
+
+    def describe(self, n: Optional[int] = None, m: Optional[int] = None, params=None) -> Dict[str, Any]:
+        info: Dict[str, Any] = {
+            "name": self.name,
+            "description": self.description,
+            "requires": list(self.requirements(params)),
+            "missing": missing_packages(self.requirements(params)),
+            "loaded": self.loaded,
+            "import_time": self.import_time,
+        }
+        if n is not None and m is not None:
+            info["variables"] = int(self.variables(n, m, params))
+            info["memory_bytes"] = int(self.memory(n, m, params)) if self.memory is not None else None
+        return info
+
+_FORMULATIONS: Dict[str, Formulation] = {}
+
+# sampler backend (params.sampler) -> packages it needs
+_BACKENDS: Dict[str, Tuple[str, ...]] = {}
+
+def register(formulation: Formulation) -> Formulation:
+    _FORMULATIONS[formulation.name] = formulation
+    return formulation
+
+def register_backend(name: str, requires: Tuple[str, ...] = ()):
+    _BACKENDS[name] = tuple(requires)
+
+def formulations() -> Dict[str, Formulation]:
+    return dict(_FORMULATIONS)
+
+def formulation_for(params) -> Formulation:
+    """
+    Formulation selected by params: classical, exact, an InfinityQ formulation by
+    qubo_type (auto for unknown types), rolling-horizon decomposition, or
+    qbsolv on the auto QUBO for every other solver_type.
+    """
+    if params.solver_type == "classical":
+        return _FORMULATIONS["classical"]
+    if params.solver_type == "exact":
+        return _FORMULATIONS["exact"]
+    if params.solver_type == "infinityq":
+        if getattr(params, "decomposition", None) == "rolling-horizon":
+            return _FORMULATIONS["infinityq:rolling-horizon"]
+        return _FORMULATIONS.get(f"infinityq:{params.qubo_type}", _FORMULATIONS["infinityq:auto"])
+    return _FORMULATIONS["qbsolv"]
+
+def missing_packages(packages) -> List[str]:
+    # find_spec locates a top-level package without importing it
+    return [name for name in packages if importlib.util.find_spec(name) is None]
+
+def import_report() -> Dict[str, Any]:
+    """
+    Which heavy packages are installed and already imported, and which
+    formulations have been loaded (with their import time).
+    """
+    return {
+        "packages": {
+            name: {"installed": importlib.util.find_spec(name) is not None, "loaded": name in sys.modules}
+            for name in HEAVY_PACKAGES
+        },
+        "formulations": {
+            name: {"loaded": formulation.loaded, "import_time": formulation.import_time}
+            for name, formulation in _FORMULATIONS.items()
+        },
+    }
+
+def preload(names: str):
+    """
+    Import formulations ahead of the first request: "all" or a comma
+    separated list of names. Formulations with missing packages are skipped.
+    """
+    selected = list(_FORMULATIONS) if names.strip() == "all" else [name.strip() for name in names.split(",") if name.strip()]
+    for name in selected:
+        formulation = _FORMULATIONS.get(name)
+        if formulation is None:
+            logger.warning("Cannot preload unknown formulation '%s'", name)
+        elif missing_packages(formulation.requires):
+            logger.warning("Not preloading %s: %s missing", name, ", ".join(missing_packages(formulation.requires)))
+        else:
+            formulation.load()
+
+register_backend("local")
+register_backend("titanq", ("titanq",))
+
+register(Formulation(
+    "classical", ".classical_solver", "solve_with_classical_algorithm",
+    variables=lambda n, m, params=None: 0, memory=lambda n, m, params=None: 8 * n * m,
+    uses_sampler=False, params_as_dict=True,
+    description="NEH, local search and iterated greedy",
+))
+register(Formulation(
+    "exact", ".branch_and_bound", "solve_with_branch_and_bound",
+    variables=lambda n, m, params=None: 0, memory=lambda n, m, params=None: 8 * n * n * m,
+    uses_sampler=False,
+    description="Branch-and-bound from NEH, optimal for small instances",
+))
+register(Formulation(
+    "qbsolv", ".auto_qbsolv", "solve_with_auto_qbsolv", requires=("autoqubo", "dwave_qbsolv"),
+    memory=_qbsolv_bytes, uses_sampler=False,
+    description="Auto-generated QUBO solved with qbsolv",
+))
+register(Formulation(
+    "infinityq:auto", ".auto_infinityq", "solve_with_auto_infinityq", memory=_auto_bytes,
+    description="Auto-generated QUBO with assignment penalty",
+))
+register(Formulation(
+    "infinityq:position-based", ".position_based", "solve_with_position_based_qubo",
+    memory=lambda n, m, params=None: _assignment_bytes(n, 0),
+    description="Linear position-based QUBO",
+))
+for name, module, function, description in (
+    ("mocellin", ".moccelin", "solve_with_mocellin_qubo", "Mocellin heuristic distance"),
+    ("widmer-hertz", ".widmer_hertz", "solve_with_widmer_hertz_qubo", "Widmer-Hertz distance"),
+    ("gupta", ".gupta", "solve_with_gupta_qubo", "Gupta distance"),
+    ("stinson-smith-1", ".stinson_smith_1", "solve_with_stinson_smith_1_qubo", "Stinson-Smith distance"),
+    ("stinson-smith-2", ".stinson_smith_2", "solve_with_stinson_smith_2_qubo", "Stinson-Smith distance, variant 2"),
+):
+    register(Formulation(f"infinityq:{name}", module, function, memory=_adjacency_bytes,
+                         description=f"{description} (TSP-like adjacency QUBO)"))
+register(Formulation(
+    "infinityq:rolling-horizon", ".rolling_horizon", "solve_with_rolling_horizon",
+    variables=lambda n, m, params=None: _window(n, params) ** 2,
+    memory=lambda n, m, params=None: _adjacency_bytes(_window(n, params), m),
+    description="Windows of a full sequence re-solved as sub-QUBOs",
+))
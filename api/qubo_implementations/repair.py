@@ -0,0 +1,130 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .deadline import cost_model
+from .evaluator import batch_makespan
+from .insertion import best_insertion
+from .local_search import local_search
+from .timing import current_deadline, phase, report_incumbent, stop_requested
+
+__all__ = ['LAYOUTS', 'SAMPLE_FIELDS', 'assignment_matrices', 'decode_samples', 'repair_assignment', 'polish_time', 'postprocess']
+
+# Variable layouts of the n*n assignment formulations:
+#   job-major:      x[j*n + pos] = 1  <=>  job j at position pos (distance-based, auto)
+#   position-major: x[pos*n + j] = 1  <=>  job j at position pos (position-based)
+LAYOUTS = ("job-major", "position-major")
+
+# Sample statistics of `postprocess` that solvers pass through to their result
+SAMPLE_FIELDS = ("feasible", "repaired_jobs", "sample_makespan", "energy_rank", "samples", "feasible_rate")
+
+def assignment_matrices(samples, n: int, layout: str = "job-major") -> np.ndarray:
+    """
+    (k, n, n) matrices X[s, job, position] of k binary sampler vectors.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}', expected one of {LAYOUTS}")
+    X = np.asarray(samples, dtype=np.float64).reshape(-1, n, n)
+    return X.transpose(0, 2, 1) if layout == "position-major" else X
+
+def repair_assignment(X: np.ndarray, p) -> Tuple[List[int], int]:
+    """
+    Nearest valid job order of a possibly infeasible assignment matrix
+    (duplicate, missing or unplaced jobs). The Hungarian method on the
+    sample's activations keeps as many of its job/position choices as
+    possible; jobs it could only put on an inactive cell are taken out and
+    reinserted greedily at their best position, longest jobs first (NEH).
+    Returns (0-based sequence, number of reinserted jobs).
+    """
+    p = np.asarray(p, dtype=np.float64)
+    jobs, positions = linear_sum_assignment(X, maximize=True)
+    jobs = jobs[np.argsort(positions)]
+    kept = X[jobs, np.sort(positions)] > 0.5
+
+    seq = jobs[kept].tolist()
+    moved = sorted(jobs[~kept].tolist(), key=lambda j: -p[j].sum())
+    for job in moved:
+        pos = best_insertion(seq, job, p)[0] if seq else 0
+        seq.insert(pos, job)
+    return seq, len(moved)
+
+def decode_samples(samples, p, layout: str = "job-major") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Job orders of all samples at once. Feasibility (a 0/1 matrix with one
+    job per position and one position per job) is checked for the whole
+    batch and feasible samples are decoded with one argmax; only the
+    infeasible ones go through `repair_assignment`.
+    Returns (perms (k, n) 0-based, feasible (k,) bool, repaired jobs (k,)).
+    """
+    p = np.asarray(p, dtype=np.float64)
+    n = p.shape[0]
+    with phase("decode"):
+        X = assignment_matrices(samples, n, layout)
+        binary = np.all((X == 0) | (X == 1), axis=(1, 2))
+        feasible = binary & np.all(X.sum(axis=1) == 1, axis=1) & np.all(X.sum(axis=2) == 1, axis=1)
+        perms = np.empty((X.shape[0], n), dtype=np.intp)
+        perms[feasible] = X[feasible].argmax(axis=1)
+
+    repaired = np.zeros(X.shape[0], dtype=np.intp)
+    with phase("repair"):
+        for i in np.flatnonzero(~feasible):
+            seq, repaired[i] = repair_assignment(X[i], p)
+            perms[i] = seq
+    return perms, feasible, repaired
+
+def polish_time(params, n: int, m: int) -> float:
+    """
+    Local search budget after sampling: params.polish_fraction of the
+    timeout, bounded by what is left of the request deadline.
+    """
+    fraction = getattr(params, "polish_fraction", 0.0) or 0.0
+    if fraction <= 0:
+        return 0.0
+    deadline = current_deadline(params.timeout)
+    return min(fraction * params.timeout, deadline.budget_for(cost_model.estimate("makespan", n, m)))
+
+def postprocess(items: Iterable[Tuple[float, Any]], p, params, layout: str = "job-major") -> Dict[str, Any]:
+    """
+    Turn the sampler output, (energy, vector) for every engine/chain, into
+    a usable schedule. All samples are decoded (repairing infeasible ones)
+    and scored by makespan in one batch; the best one by true makespan,
+    energy breaking ties, is polished with first-improvement insertion
+    local search within `polish_time`, unless it is already known to be
+    optimal (it reaches the instance's lower bound).
+
+    Returns the 0-based "sequence" and its "makespan", the chosen sample's
+    "energy", "solution" vector, "energy_rank" (1 = lowest energy) and
+    whether it was "feasible" as sampled, its "repaired_jobs" and
+    "sample_makespan" before polishing, plus the number of "samples" and
+    their "feasible_rate".
+    """
+    p = np.asarray(p, dtype=np.float64)
+    n, m = p.shape
+    with phase("decode"):
+        items = list(items)
+        energies = np.array([float(energy) for energy, _ in items])
+        samples = np.asarray([vec for _, vec in items])
+    perms, feasible, repaired = decode_samples(samples, p, layout)
+    with phase("makespan"):
+        makespans = batch_makespan(perms, p)
+
+    best = int(np.lexsort((energies, makespans))[0])
+    seq = perms[best].tolist()
+    makespan = float(makespans[best])
+    report_incumbent(seq, makespan)
+    time_limit = polish_time(params, n, m)
+    if time_limit > 0 and not stop_requested():
+        with phase("polish"):
+            seq, makespan = local_search(seq, p, neighbourhood="insertion", strategy="first", time_limit=time_limit)
+    return {
+        "sequence": seq,
+        "makespan": float(makespan),
+        "energy": float(energies[best]),
+        "solution": [int(x) for x in samples[best]],
+        "energy_rank": int(np.sum(energies < energies[best])) + 1,
+        "feasible": bool(feasible[best]),
+        "repaired_jobs": int(repaired[best]),
+        "sample_makespan": float(makespans[best]),
+        "samples": len(items),
+        "feasible_rate": float(feasible.mean()),
+    }
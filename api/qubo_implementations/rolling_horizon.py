@@ -0,0 +1,190 @@
+import math
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from .classical_solver import neh
+from .deadline import cost_model
+from .distances import d1_matrix, d2_matrix, d3_matrix, d4_matrix, d5_matrix
+from .evaluator import batch_makespan, sequence_makespan
+from .local_sampler import MIN_SAMPLER_TIME, ParallelTemperingModel, create_model, sampler_backend
+from .qubo import Qubo
+from .qubo_builder import ADJACENCY_SCALE, adjacency_objective, assignment_constraints
+from .repair import decode_samples
+from .timing import current_deadline, phase, record_size, report_incumbent, stop_requested, untimed_context
+from .warm_start import encode_sequence, seed_sequences
+
+__all__ = ['WINDOW_DISTANCES', 'window_qubo', 'solve_window', 'solve_with_rolling_horizon']
+
+# Distance matrix of each distance-based formulation; windows of any other
+# qubo_type (position-based, auto) use Mocellin's
+WINDOW_DISTANCES = {
+    "widmer-hertz": d1_matrix,
+    "gupta": d2_matrix,
+    "stinson-smith-1": d3_matrix,
+    "mocellin": d4_matrix,
+    "stinson-smith-2": d5_matrix,
+}
+
+def window_qubo(d: np.ndarray, jobs: np.ndarray, prev: Optional[int], nxt: Optional[int]) -> Qubo:
+    """
+    Distance-based Qubo of re-ordering `jobs` inside a window.
+    The fixed neighbours enter as boundary conditions: the distance from
+    the last prefix job `prev` is a bias on the window's first position and
+    the distance to the first suffix job `nxt` one on its last position.
+    """
+    w = len(jobs)
+    with phase("qubo_assembly"):
+        # Scaled like the full distance-based formulations
+        W = adjacency_objective(d[np.ix_(jobs, jobs)], w) * np.float32(ADJACENCY_SCALE)
+        b = np.zeros(w * w, dtype=np.float32)
+        rows = np.arange(w) * w
+        if prev is not None:
+            b[rows] += ADJACENCY_SCALE * d[prev, jobs]
+        if nxt is not None:
+            b[rows + w - 1] += ADJACENCY_SCALE * d[jobs, nxt]
+        CW, CB = assignment_constraints(w)
+    return Qubo.from_matrix(W, b, constraint_weights=CW, constraint_bounds=CB)
+
+def solve_window(p: np.ndarray, d: np.ndarray, seq: List[int], completion: np.ndarray, start: int, length: int,
+                 params, timeout: float) -> Optional[Tuple[List[int], float]]:
+    """
+    Re-solve positions [start, start + length) of `seq` as a sub-QUBO. Sampled
+    window orders are scored exactly: the window and the fixed suffix are
+    simulated from the prefix completion times (`completion[start - 1]`).
+    Returns (improved window jobs, full makespan), or None if no sample
+    beats the current order.
+    """
+    n = len(seq)
+    jobs = np.asarray(seq[start:start + length], dtype=np.intp)
+    w = len(jobs)
+    prev = seq[start - 1] if start > 0 else None
+    nxt = seq[start + w] if start + w < n else None
+    model = window_qubo(d, jobs, prev, nxt).to_model(create_model(params))
+    # The local sampler starts from the current window order
+    warm_start = {}
+    if isinstance(model, ParallelTemperingModel):
+        warm_start["initial_state"] = encode_sequence(list(range(w)), w)[None, :]
+
+    beta = (1.0 / np.geomspace(params.T_min, params.T_max, params.num_chains)).tolist()
+    with phase("sampler"):
+        res = model.optimize(
+            beta=beta,
+            timeout_in_secs=timeout,
+            num_engines=params.num_engines,
+            num_chains=params.num_chains,
+            coupling_mult=getattr(params, 'coupling_multiplier', 0.4),
+            **warm_start
+        )
+
+    perms, _, _ = decode_samples([vec for _, vec in res.result_items()], p[jobs])
+    suffix = np.asarray(seq[start + w:], dtype=np.intp)
+    orders = jobs[perms]
+    tails = np.hstack([orders, np.broadcast_to(suffix, (len(orders), len(suffix)))])
+    release = completion[start - 1] if start > 0 else None
+    with phase("makespan"):
+        makespans = batch_makespan(tails, p, start=release)
+        current = batch_makespan(np.concatenate([jobs, suffix])[None, :], p, start=release)[0]
+    best = int(np.argmin(makespans))
+    if makespans[best] >= current:
+        return None
+    return orders[best].tolist(), float(makespans[best])
+
+def solve_with_rolling_horizon(job_matrix, params):
+    """
+    Rolling-horizon decomposition for instances too large for one QUBO.
+    Starting from the best of NEH and any warm-start sequences, every pass
+    cuts the sequence into non-overlapping windows of `window_size`
+    positions, re-solves them as sub-QUBOs of window_size^2 variables
+    (in parallel threads on TitanQ; one after another on the local
+    sampler, whose sweep loop holds the GIL) and splices improved windows back in, keeping each splice
+    only if the full makespan still improves. Passes alternate the window
+    offset so window borders move; the run ends at the deadline or after
+    two passes without improvement.
+    """
+    start_time = time.perf_counter()
+    n = job_matrix.jobs
+    m = job_matrix.machines
+    pik = job_matrix.processing_times
+    p = np.asarray(pik, dtype=np.float64)
+    deadline = current_deadline(params.timeout)
+    reserve = cost_model.estimate("makespan", n, m)
+
+    w = max(2, min(params.window_size or 10, n))
+    # Remote TitanQ calls overlap on threads; the pure-Python local sampler would only take turns
+    workers = 1 if sampler_backend(params) == "local" else max(1, params.window_workers or 1)
+    with phase("distances"):
+        d = WINDOW_DISTANCES.get(params.qubo_type, d4_matrix)(pik)
+    record_size(variables=w * w, windows=math.ceil(n / w))
+
+    # Initial sequence: the best of NEH and the client / previously known ones
+    with phase("neh"):
+        candidates = seed_sequences(pik, params)
+        if not getattr(params, "warm_start", False):
+            candidates.append(neh(pik, n, m)[0])
+        seq = min(candidates, key=lambda s: sequence_makespan(s, p))
+    makespan = sequence_makespan(seq, p)
+    initial_makespan = makespan
+    report_incumbent(seq, makespan)
+
+    passes, stale, windows_solved, windows_improved = 0, 0, 0, 0
+    while stale < 2 and not stop_requested():
+        # (start, length) of the windows; odd passes shift them by half a window
+        offset = 0 if passes % 2 == 0 else w // 2
+        spans = [(s, min(w, n - s)) for s in range(offset, n, w)]
+        if offset:
+            spans.insert(0, (0, offset))
+        spans = [span for span in spans if span[1] >= 2]
+        rounds = math.ceil(len(spans) / workers)
+        budget = deadline.budget_for(reserve)
+        if budget < MIN_SAMPLER_TIME:
+            break
+        # A pass takes at most half of what is left, so the shifted pass gets its turn
+        timeout = max(budget / 2 / rounds, MIN_SAMPLER_TIME)
+
+        completion = batch_makespan(np.asarray(seq)[None, :], p, return_completion=True)[1][0]
+        # The fan-out is timed as one wall-clock phase
+        with phase("windows"):
+            if workers == 1:
+                results = []
+                for s, length in spans:
+                    if stop_requested():
+                        break
+                    results.append((s, solve_window(p, d, seq, completion, s, length, params, timeout)))
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    # Overlapping windows keep the request's deadline and stop but not its phase sums
+                    futures = [pool.submit(untimed_context().run, solve_window,
+                                           p, d, seq, completion, s, length, params, timeout) for s, length in spans]
+                    results = [(s, future.result()) for (s, _), future in zip(spans, futures)]
+        windows_solved += len(results)
+
+        improved = False
+        for s, window in results:
+            if window is None:
+                continue
+            trial = seq[:s] + window[0] + seq[s + len(window[0]):]
+            trial_makespan = sequence_makespan(trial, p)
+            if trial_makespan < makespan:
+                seq, makespan = trial, trial_makespan
+                windows_improved += 1
+                improved = True
+        passes += 1
+        if improved:
+            stale = 0
+            report_incumbent(seq, makespan, iteration=passes)
+        else:
+            stale += 1
+
+    return {
+        "sequence": [j + 1 for j in seq],  # 1-based for the frontend
+        "makespan": makespan,
+        "energy": 0.0,  # Not meaningful across windows
+        "execution_time": time.perf_counter() - start_time,
+        "initial_makespan": initial_makespan,
+        "window_size": w,
+        "passes": passes,
+        "windows_solved": windows_solved,
+        "windows_improved": windows_improved,
+    }
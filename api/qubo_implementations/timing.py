@@ -0,0 +1,188 @@
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from .deadline import Deadline
+
+__all__ = [
+    'PhaseTimer', 'timed_request', 'current_timer', 'phase', 'record_size',
+    'emit', 'report_incumbent', 'stop_requested', 'current_deadline',
+    'current_lower_bound', 'bound_reached', 'untimed_context',
+]
+
+# listener(event, data) receives progress events of a streaming solve
+Listener = Callable[[str, Dict[str, Any]], None]
+
+class PhaseTimer:
+    """
+    Per-request instrumentation: wall time of named pipeline phases
+    (monotonic clock) and problem/matrix sizes. Repeated phases accumulate.
+    An optional listener receives "phase" events as phases finish plus any
+    events the solvers emit; `stop` lets the caller end the solve early and
+    `deadline` bounds the whole request. The best reported makespan is kept
+    so the solve can stop once it reaches the instance's lower bound.
+    """
+
+    def __init__(self, listener: Optional[Listener] = None, stop: Optional[threading.Event] = None,
+                 deadline: Optional[Deadline] = None):
+        self._start = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.sizes: Dict[str, int] = {}
+        self.listener = listener
+        self.stop = stop
+        self.deadline = deadline
+        self.lower_bound: Optional[float] = None
+        self.best_makespan: Optional[float] = None
+        # Phases may run on helper threads (e.g. parallel decomposition windows)
+        self._lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def emit(self, event: str, data: Dict[str, Any]):
+        if self.listener is not None:
+            self.listener(event, dict(data, elapsed=self.elapsed()))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + duration
+            self.emit("phase", {"phase": name, "duration": duration})
+
+    def record_size(self, **sizes: int):
+        with self._lock:
+            self.sizes.update({key: int(value) for key, value in sizes.items()})
+
+    def record_incumbent(self, makespan: float):
+        with self._lock:
+            if self.best_makespan is None or makespan < self.best_makespan:
+                self.best_makespan = makespan
+
+    def bound_reached(self) -> bool:
+        # Makespans are sums of the same processing times, so equality is exact up to rounding
+        return (self.lower_bound is not None and self.best_makespan is not None
+                and self.best_makespan <= self.lower_bound + 1e-9)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "phases": dict(self.phases),
+                "sizes": dict(self.sizes),
+                "total": time.perf_counter() - self._start,
+            }
+
+_current: "contextvars.ContextVar[Optional[PhaseTimer]]" = contextvars.ContextVar("phase_timer", default=None)
+
+@contextmanager
+def timed_request(listener: Optional[Listener] = None, stop: Optional[threading.Event] = None,
+                  deadline: Optional[Deadline] = None) -> Iterator[PhaseTimer]:
+    """
+    Install a fresh PhaseTimer for the solve running in this context.
+    """
+    timer = PhaseTimer(listener, stop, deadline)
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+
+def current_timer() -> Optional[PhaseTimer]:
+    return _current.get()
+
+def untimed_context() -> contextvars.Context:
+    """
+    Copy of the current context for a helper thread whose phases overlap
+    others in wall time: the request's stop event, deadline and lower bound
+    still apply, but its phases and sizes go to a scratch timer instead of
+    being summed into the request's.
+    """
+    timer = _current.get()
+    context = contextvars.copy_context()
+    if timer is not None:
+        scratch = PhaseTimer(stop=timer.stop, deadline=timer.deadline)
+        scratch.lower_bound = timer.lower_bound
+        scratch.best_makespan = timer.best_makespan
+        context.run(_current.set, scratch)
+    return context
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Time a phase on the current request's timer; a no-op outside a request
+    (e.g. when a formulation is called directly).
+    """
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    with timer.phase(name):
+        yield
+
+def record_size(**sizes: int):
+    timer = _current.get()
+    if timer is not None:
+        timer.record_size(**sizes)
+
+def emit(event: str, **data: Any):
+    timer = _current.get()
+    if timer is not None:
+        timer.emit(event, data)
+
+def report_incumbent(sequence, makespan: float, iteration: Optional[int] = None):
+    """
+    Record a new best solution (0-based job sequence) of the running solve
+    and announce it to a streaming caller.
+    """
+    timer = _current.get()
+    if timer is None:
+        return
+    timer.record_incumbent(float(makespan))
+    if timer.listener is not None:
+        timer.emit("incumbent", {
+            "sequence": [int(j) + 1 for j in sequence],
+            "makespan": float(makespan),
+            "iteration": iteration,
+        })
+
+def stop_requested() -> bool:
+    """
+    True once the caller asked to stop, the request deadline has passed or
+    a reported incumbent reached the instance's lower bound (it is then
+    optimal); long-running loops should then return their current best.
+    """
+    timer = _current.get()
+    if timer is None:
+        return False
+    if timer.stop is not None and timer.stop.is_set():
+        return True
+    if timer.bound_reached():
+        return True
+    return timer.deadline is not None and timer.deadline.expired()
+
+def current_lower_bound() -> Optional[float]:
+    timer = _current.get()
+    return timer.lower_bound if timer is not None else None
+
+def bound_reached() -> bool:
+    """
+    True once the running solve has reported a provably optimal incumbent.
+    """
+    timer = _current.get()
+    return timer is not None and timer.bound_reached()
+
+def current_deadline(timeout: float) -> Deadline:
+    """
+    Deadline of the running request, or a fresh one of `timeout` seconds
+    when a solver is called directly.
+    """
+    timer = _current.get()
+    if timer is not None and timer.deadline is not None:
+        return timer.deadline
+    return Deadline(timeout)
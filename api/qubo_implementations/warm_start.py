@@ -0,0 +1,140 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .local_sampler import ParallelTemperingModel
+from .qubo_cache import instance_key
+from .evaluator import batch_makespan
+from .timing import phase, report_incumbent
+
+__all__ = [
+    'BestKnown', 'best_known', 'remember_solution', 'check_initial_sequences', 'encode_sequence',
+    'seed_sequences', 'warm_start_kwargs', 'with_seeds',
+]
+
+logger = logging.getLogger(__name__)
+
+class BestKnown:
+    """
+    Thread-safe LRU of the best job sequence found so far per instance
+    (content hash of the processing times), across solvers and requests
+    served by this process.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[List[int], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[List[int], float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def update(self, key: str, sequence: List[int], makespan: float) -> bool:
+        """
+        Store `sequence` unless an equal or better one is known; returns
+        whether it was stored.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= makespan:
+                return False
+            self._entries[key] = (list(sequence), float(makespan))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+best_known = BestKnown(int(os.environ.get("BEST_KNOWN_ENTRIES", 256)))
+
+def _is_permutation(seq, n: int) -> bool:
+    return len(seq) == n and sorted(seq) == list(range(n))
+
+def check_initial_sequences(sequences: Optional[List[List[int]]], n: Optional[int] = None):
+    """
+    Raise ValueError unless every client sequence is a 1-based permutation
+    of jobs 1..n (n: the instance's job count, or the first sequence's
+    length when the instance is not known yet).
+    """
+    for sequence in sequences or []:
+        if n is None:
+            n = len(sequence)
+        if not _is_permutation([int(j) - 1 for j in sequence], n):
+            raise ValueError(f"Initial sequence {sequence} is not a permutation of jobs 1..{n}")
+
+def remember_solution(pik, sequence: List[int], makespan: float):
+    """
+    Record a solve's result (1-based sequence) as a warm start for later
+    solves of the same instance.
+    """
+    n = len(pik)
+    seq = [int(j) - 1 for j in sequence]
+    if _is_permutation(seq, n):
+        best_known.update(instance_key(pik, "sequence"), seq, makespan)
+
+def encode_sequence(seq: List[int], n: int, layout: str = "job-major") -> np.ndarray:
+    """
+    Binary assignment vector of a 0-based job sequence in the given
+    variable layout (see repair.LAYOUTS).
+    """
+    X = np.zeros((n, n), dtype=np.float64)
+    X[np.asarray(seq, dtype=np.intp), np.arange(n)] = 1.0
+    return (X.T if layout == "position-major" else X).ravel()
+
+def seed_sequences(pik, params) -> List[List[int]]:
+    """
+    0-based warm-start sequences: params.initial_sequences (1-based, as
+    sent by the client) and, with params.warm_start, the best sequence of
+    an earlier solve of this instance and the NEH sequence. The client's
+    sequences are validated with the request (check_initial_sequences).
+    """
+    n = len(pik)
+    seeds = [[int(j) - 1 for j in sequence] for sequence in getattr(params, "initial_sequences", None) or []]
+    if getattr(params, "warm_start", False):
+        known = best_known.get(instance_key(pik, "sequence"))
+        if known is not None:
+            seeds.append(known[0])
+        # Imported here because the classical solver pulls in the local search stack
+        from .classical_solver import neh
+        seeds.append(neh(pik, n, len(pik[0]))[0])
+    return seeds
+
+def warm_start_kwargs(model, pik, params, layout: str = "job-major") -> Dict[str, Any]:
+    """
+    Extra optimize() arguments that start the sampler chains from the seed
+    sequences. Only the local sampler takes initial states; TitanQ's
+    optimize() has no such argument, so the seeds are skipped there.
+    The best seed is reported as the incumbent, so a seed that is already
+    optimal ends sampling early.
+    """
+    if not (getattr(params, "initial_sequences", None) or getattr(params, "warm_start", False)):
+        return {}
+    if not isinstance(model, ParallelTemperingModel):
+        logger.info("Sampler %s does not accept initial states; warm start skipped", type(model).__name__)
+        return {}
+    with phase("warm_start"):
+        n = len(pik)
+        seeds = seed_sequences(pik, params)
+        if seeds:
+            makespans = batch_makespan(np.asarray(seeds, dtype=np.intp), np.asarray(pik, dtype=np.float64))
+            best = int(np.argmin(makespans))
+            report_incumbent(seeds[best], makespans[best])
+        return {"initial_state": np.stack([encode_sequence(seq, n, layout) for seq in seeds])}
+
+def with_seeds(items, model, warm_start: Dict[str, Any]) -> List[Tuple[float, Any]]:
+    """
+    Sampler results plus the warm-start states themselves as (energy,
+    vector) pairs, so the chosen schedule is never worse than a seed.
+    """
+    items = list(items)
+    states = warm_start.get("initial_state")
+    if states is None:
+        return items
+    return items + list(zip(model.objective(states), states))
@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Tuple
+
+from .qubo_implementations.qubo_cache import instance_key
+
+__all__ = ['result_key', 'ResultCache', 'result_cache']
+
+def result_key(processing_times, params: Dict[str, Any]) -> str:
+    """
+    Canonical hash of a solve request: the processing times (however they
+    were encoded) plus every solver parameter, seed included.
+    """
+    return instance_key(processing_times, "result:" + json.dumps(params, sort_keys=True, default=str))
+
+class ResultCache:
+    """
+    Thread-safe cache of finished solve results with a TTL and an LRU bound
+    on the number of entries. Identical requests that arrive while one is
+    being solved are coalesced: they wait for that solve's result (or
+    exception) instead of starting their own. Failed solves are not cached.
+    With max_entries or ttl at 0 only coalescing remains.
+    Cached results are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (stored at, result)
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        return cls(int(os.environ.get("RESULT_CACHE_ENTRIES", 256)), float(os.environ.get("RESULT_CACHE_TTL", 600)))
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def get_or_solve(self, key: str, solve: Callable[[], Dict[str, Any]],
+                     refresh: bool = False) -> Tuple[Dict[str, Any], str]:
+        """
+        (result, source) where source is "hit", "coalesced" or "miss".
+        refresh skips the lookup (the new result still replaces the entry)
+        but joins an identical solve already running.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is not None and not refresh:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], "hit"
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result(), "coalesced"
+        try:
+            result = solve()
+        except BaseException as e:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._pending[key]
+            if self.enabled:
+                self._entries[key] = (time.monotonic(), result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        future.set_result(result)
+        return result, "miss"
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.coalesced + self.misses
+            return {
+                "entries": len(self._entries),
+                "in_flight": len(self._pending),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "coalesced": self.coalesced,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            }
+
+# Results of /api/solve_qubo in this process
+result_cache = ResultCache.from_env()
@@ -1,30 +1,87 @@
+import os
+import json
+import time
+import logging
+
+# Cold-start time of this module, reported at startup
+_import_start = time.perf_counter()
+
 import numpy as np
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, field_serializer, field_validator, model_validator
 from typing import List, Optional
 
-# Import QUBO implementations
-from .qubo_implementations.position_based import solve_with_position_based_qubo
-from .qubo_implementations.moccelin import solve_with_mocellin_qubo
-from .qubo_implementations.widmer_hertz import solve_with_widmer_hertz_qubo
-from .qubo_implementations.gupta import solve_with_gupta_qubo
-from .qubo_implementations.stinson_smith_1 import solve_with_stinson_smith_1_qubo
-from .qubo_implementations.stinson_smith_2 import solve_with_stinson_smith_2_qubo
-from .qubo_implementations.auto_qbsolv import solve_with_auto_qbsolv
-from .qubo_implementations.auto_infinityq import solve_with_auto_infinityq
-# Import classical solver
-from .qubo_implementations.classical_solver import solve_with_classical_algorithm
+# QUBO implementations and the classical solver are imported on first use
+# through the registry, so titanq, autoqubo etc. stay out of the cold start
+from .qubo_implementations.registry import formulation_for, formulations, import_report, preload
+from .qubo_implementations.qubo_cache import qubo_cache
+from .qubo_implementations.bounds import lower_bounds, optimality_gap
+from .qubo_implementations.deadline import Deadline, cost_model
+from .qubo_implementations.timing import timed_request
+from .qubo_implementations.warm_start import check_initial_sequences, remember_solution
+from .jobs import JobManager, QueueFullError
+from .metrics import metrics, observe_cached, observe_failure, observe_solve
+from .result_cache import result_cache, result_key
+from .payload import decode_base64_matrix, json_default, load_npy, npz_response, processing_time_array, wants_npz
+from .streaming import SolveStreams
+
+# LOG_LEVEL=DEBUG also logs full request payloads and results. The level is
+# set explicitly because titanq installs a root handler on import, which
+# turns basicConfig into a no-op.
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+logging.basicConfig(level=LOG_LEVEL)
+logging.getLogger().setLevel(LOG_LEVEL)
+logger = logging.getLogger(__name__)
 
 class JobMatrixModel(BaseModel):
+    """
+    Processing times arrive as nested JSON lists, as base64 of a
+    little-endian row-major (jobs, machines) matrix, or (/api/solve_qubo/npy)
+    as an uploaded .npy file. Either way `processing_times` ends up as one
+    read-only float64 array that all solver stages share.
+    """
     jobs: int
     machines: int
-    processing_times: List[List[float]]
+    # Holds the shared array once the model is validated
+    processing_times: Optional[List[List[float]]] = Field(None, description="Matrix of shape (jobs, machines)")
+    processing_times_b64: Optional[str] = None  # base64 little-endian matrix, see processing_times_dtype
+    processing_times_dtype: Optional[str] = "float32"  # float32, float64
+
+    @model_validator(mode="after")
+    def _as_array(self):
+        if self.processing_times_b64 is not None:
+            value = decode_base64_matrix(self.processing_times_b64, (self.jobs, self.machines),
+                                         self.processing_times_dtype or "float32")
+            # The decoded array replaces the encoded copy
+            self.processing_times_b64 = None
+        elif self.processing_times is None:
+            raise ValueError("Either processing_times or processing_times_b64 must be provided")
+        else:
+            value = self.processing_times
+        self.processing_times = processing_time_array(value, self.jobs, self.machines)
+        return self
+
+    @classmethod
+    def from_array(cls, matrix: np.ndarray) -> "JobMatrixModel":
+        """
+        Model of an already decoded (jobs, machines) matrix, such as an
+        uploaded .npy file, without converting it to nested lists for the
+        list validation.
+        """
+        jobs, machines = matrix.shape
+        return cls.model_construct(jobs=int(jobs), machines=int(machines),
+                                   processing_times=processing_time_array(matrix, jobs, machines))
+
+    @field_serializer("processing_times")
+    def _serialize_processing_times(self, value):
+        return value.tolist() if isinstance(value, np.ndarray) else value
 
 class SolverParams(BaseModel):
     # Common parameters
     timeout: Optional[float] = 60.0
-    solver_type: Optional[str] = "qbsolv"  # qbsolv, infinityq, leaphybrid
+    solver_type: Optional[str] = "qbsolv"  # qbsolv, infinityq, classical, exact, leaphybrid
     qubo_type: Optional[str] = "auto"  # auto, position-based, mocellin
     
     # InfinityQ specific parameters
@@ -34,18 +91,62 @@ class SolverParams(BaseModel):
     T_min: Optional[float] = 0.01
     T_max: Optional[float] = 1e9
     coupling_multiplier: Optional[float] = 0.4
+    sampler: Optional[str] = None  # titanq, local (default: QUBO_SAMPLER env var, else titanq)
+    verify_qubo: Optional[bool] = False  # check closed-form auto QUBO against autoqubo
+    polish_fraction: Optional[float] = 0.1  # share of timeout for insertion local search on the sample (0 disables)
+    warm_start: Optional[bool] = False  # start sampler chains from NEH and the best known sequence (local sampler)
+    initial_sequences: Optional[List[List[int]]] = None  # 1-based schedules to start sampler chains from
+    decomposition: Optional[str] = None  # rolling-horizon: re-solve windows of a full sequence as sub-QUBOs
+    window_size: Optional[int] = 10  # positions per window (window_size^2 variables per sub-QUBO)
+    window_workers: Optional[int] = 4  # windows solved in parallel (TitanQ; the local sampler runs them in turn)
     
     # Classical solver parameters
     iteration_count: Optional[int] = 10000
     k_remove: Optional[int] = 100
+    neighbourhood: Optional[str] = "swap"  # swap, insertion
+    local_search_strategy: Optional[str] = "first"  # first, best, dlb
+    workers: Optional[int] = 1  # >1 runs multi-start IG (or the exact search) on a process pool
+    seed: Optional[int] = None
     
     # Remove the repeat parameter
     # repeat: Optional[int] = 1
 
+    @field_validator("initial_sequences")
+    @classmethod
+    def _check_initial_sequences(cls, value):
+        # The job count is checked against the instance by the request models
+        check_initial_sequences(value)
+        return value
+
 class SolverRequest(BaseModel):
     job_matrix: JobMatrixModel
     params: Optional[SolverParams] = None
 
+    @model_validator(mode="after")
+    def _check_sequences_fit(self):
+        if self.params is not None:
+            check_initial_sequences(self.params.initial_sequences, self.job_matrix.jobs)
+        return self
+
+class BatchInstance(BaseModel):
+    id: Optional[str] = None
+    job_matrix: JobMatrixModel
+    params: Optional[SolverParams] = None  # overrides the shared batch params
+
+class BatchSolveRequest(BaseModel):
+    instances: List[BatchInstance]
+    params: Optional[SolverParams] = None  # shared by every instance
+
+    @model_validator(mode="after")
+    def _check_sequences_fit(self):
+        shared = self.params.initial_sequences if self.params is not None else None
+        for item in self.instances:
+            sequences = shared
+            if item.params is not None and "initial_sequences" in item.params.model_fields_set:
+                sequences = item.params.initial_sequences
+            check_initial_sequences(sequences, item.job_matrix.jobs)
+        return self
+
 # Add this near the top of your FastAPI app
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -60,9 +161,88 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Process pool behind the asynchronous /api/jobs endpoints
+job_manager = JobManager.from_env()
+
+# Background solves behind the /api/solve_stream SSE endpoint
+solve_streams = SolveStreams()
+
+def solver_label(params: SolverParams) -> str:
+    """Metrics label of the solver / formulation selected by params"""
+    if params.solver_type == "classical":
+        return "classical"
+    if params.solver_type == "infinityq":
+        if params.decomposition == "rolling-horizon":
+            return "infinityq:rolling-horizon"
+        return f"infinityq:{params.qubo_type}"
+    return params.solver_type
+
+def solve(job_matrix: JobMatrixModel, params: SolverParams, listener=None, stop=None):
+    """
+    Solve one instance (blocking). The result carries a "timings" section
+    with per-phase durations and problem sizes. listener(event, data) gets
+    progress events and setting the `stop` threading.Event ends the solve
+    early (see SolveStreams). params.timeout bounds the whole solve, QUBO
+    construction and decoding included, not only the sampler call.
+
+    The instance's lower bound (cached per instance) ends the solve as soon
+    as an incumbent reaches it; the result reports "lower_bound",
+    "optimality_gap" ((makespan - bound) / bound) and "proven_optimal".
+    A solver that proves a stronger bound itself (the exact solver)
+    returns it as its own "lower_bound", which then takes precedence.
+    """
+    with timed_request(listener, stop, Deadline(params.timeout)) as timer:
+        timer.record_size(jobs=job_matrix.jobs, machines=job_matrix.machines)
+        bounds = lower_bounds(job_matrix.processing_times)
+        timer.lower_bound = bounds["lower_bound"]
+        result = dispatch(job_matrix, params)
+    result["timings"] = timer.report()
+    lower_bound = max(bounds["lower_bound"], result.get("lower_bound") or 0.0)
+    gap = optimality_gap(result["makespan"], lower_bound)
+    result.update(lower_bound=lower_bound, lower_bounds=bounds, optimality_gap=gap,
+                  proven_optimal=gap == 0.0)
+    # Phase cost estimates of later solves learn from this one
+    cost_model.observe_report(result["timings"])
+    # Warm start for later solves of the same instance
+    remember_solution(job_matrix.processing_times, result["sequence"], result["makespan"])
+    return result
+
+def record_result(params: SolverParams, result=None, error=None):
+    """Aggregate a finished solve into the /metrics histograms"""
+    if error is None:
+        observe_solve(solver_label(params), result.get("timings", {}))
+    else:
+        observe_failure(solver_label(params))
+
+def dispatch(job_matrix: JobMatrixModel, params: SolverParams):
+    """Run the solver selected by params (see registry.formulation_for)"""
+    return formulation_for(params).solve(job_matrix, params)
+
+# Declared without async so FastAPI runs the CPU-bound solve in its threadpool
+# instead of blocking the event loop
 @app.post("/api/solve_qubo")
-async def solve_qubo_endpoint(request: SolverRequest = None, job_matrix: JobMatrixModel = None, params: SolverParams = None):
-    """Unified endpoint for solving QUBO problems"""
+def solve_qubo_endpoint(request: SolverRequest = None, job_matrix: JobMatrixModel = None, params: SolverParams = None,
+                        http_request: Request = None):
+    """
+    Unified endpoint for solving QUBO problems. Clients sending
+    "Accept: application/x-npz" get the result as an .npz archive.
+
+    Identical requests (same processing times and params) are answered
+    from the result cache, or wait for the identical solve in progress;
+    "cache_hit" tells whether the result was computed for this request.
+    "Cache-Control: no-cache" forces a fresh solve.
+    """
+    headers = http_request.headers if http_request is not None else {}
+    accept = headers.get("accept")
+    refresh = "no-cache" in headers.get("cache-control", "")
+    # Only the request that runs the solve (the cache "miss") records its outcome
+    coalescing, owner = False, False
+    # A SolverRequest checks its sequences against the instance when it is parsed
+    if request is None and job_matrix is not None and params is not None:
+        try:
+            check_initial_sequences(params.initial_sequences, job_matrix.jobs)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
     try:
         # Handle both request formats
         if request is not None:
@@ -75,42 +255,229 @@ async def solve_qubo_endpoint(request: SolverRequest = None, job_matrix: JobMatr
             if job_matrix is None:
                 raise ValueError("Either 'request' or 'job_matrix' must be provided")
         
-        # Add this logging
-        print("Received request with params:", params.dict())
-        print("Job matrix:", job_matrix.dict())
+        logger.info("Solving %dx%d instance with %s", job_matrix.jobs, job_matrix.machines, solver_label(params))
+        # Full payloads only at debug level: printing large matrices is costly
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received request with params: %s", params.model_dump())
+            logger.debug("Job matrix: %s", job_matrix.model_dump())
         
-        # Add a new condition for the classical solver
-        if params.solver_type == "classical":
-            return solve_with_classical_algorithm(job_matrix, params.dict())
-        elif params.solver_type == "infinityq":
-            if params.qubo_type == "position-based":
-                # Position-based QUBO implementation with InfinityQ solver
-                return solve_with_position_based_qubo(job_matrix, params)
-            elif params.qubo_type == "mocellin":
-                # Mocellin QUBO implementation with InfinityQ solver
-                return solve_with_mocellin_qubo(job_matrix, params)
-            elif params.qubo_type == "widmer-hertz":
-                return solve_with_widmer_hertz_qubo(job_matrix, params)
-            elif params.qubo_type == "gupta":
-                return solve_with_gupta_qubo(job_matrix, params)
-            elif params.qubo_type == "stinson-smith-1":
-                return solve_with_stinson_smith_1_qubo(job_matrix, params)
-            elif params.qubo_type == "stinson-smith-2":
-                return solve_with_stinson_smith_2_qubo(job_matrix, params)
-            else:  # auto
-                # Auto-generated QUBO with InfinityQ solver
-                return solve_with_auto_infinityq(job_matrix, params)
+        key = result_key(job_matrix.processing_times, params.model_dump())
+        def solve_once():
+            nonlocal owner
+            owner = True
+            return solve(job_matrix, params)
+
+        coalescing = True
+        result, source = result_cache.get_or_solve(key, solve_once, refresh=refresh)
+        coalescing = False
+        if source == "miss":
+            record_result(params, result)
         else:
-            # Other solvers (QBSOLV, LeapHybrid) always use auto-generated QUBO
-            return solve_with_auto_qbsolv(job_matrix, params)
+            logger.info("Answered from the result cache (%s)", source)
+            observe_cached(solver_label(params), source)
+        # A copy: the cached result is shared between requests
+        result = dict(result, cache_hit=source != "miss")
+        return npz_response(result) if wants_npz(accept) else result
     except Exception as e:
-        print(f"Error in solve_qubo: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        detail = str(getattr(e, "detail", e))
+        logger.error("Error in solve_qubo: %s", detail)
+        if params is not None:
+            if coalescing and not owner:
+                # The identical solve this request waited for failed; its owner counted the error
+                observe_cached(solver_label(params), "coalesced")
+            else:
+                record_result(params, error=e)
+        raise HTTPException(status_code=500, detail=detail)
+
+@app.post("/api/solve_qubo/npy")
+def solve_qubo_npy_endpoint(http_request: Request, processing_times: UploadFile = File(...),
+                            params: Optional[str] = Form(None)):
+    """
+    Solve an instance uploaded as multipart form data: the (jobs, machines)
+    matrix as a .npy file and the SolverParams as a JSON string field.
+    """
+    try:
+        matrix = load_npy(processing_times.file.read())
+        job_matrix = JobMatrixModel.from_array(matrix)
+        solver_params = SolverParams.model_validate_json(params) if params else SolverParams()
+        check_initial_sequences(solver_params.initial_sequences, job_matrix.jobs)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return solve_qubo_endpoint(job_matrix=job_matrix, params=solver_params, http_request=http_request)
+
+@app.post("/api/jobs", status_code=202)
+def submit_job(request: SolverRequest):
+    """Queue a solve on the worker pool and return its job id"""
+    params = request.params or SolverParams()
+    try:
+        job_id = job_manager.submit(solve, request.job_matrix, params,
+                                    on_done=lambda result, error: record_result(params, result, error))
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    return job_manager.status(job_id)
+
+@app.get("/api/jobs")
+def job_queue_stats():
+    """Worker pool capacity and current queue depth"""
+    return job_manager.stats()
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    """Poll the status of a submitted job"""
+    try:
+        return job_manager.status(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+
+@app.get("/api/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    """Result of a finished job; 202 while it is still queued or running"""
+    try:
+        info = job_manager.status(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+    if info["status"] in ("queued", "running"):
+        return JSONResponse(status_code=202, content=info)
+    if info["status"] == "cancelled":
+        raise HTTPException(status_code=410, detail="Job was cancelled")
+    if info["status"] == "failed":
+        raise HTTPException(status_code=500, detail=info["error"])
+    return job_manager.result(job_id)
+
+@app.delete("/api/jobs/{job_id}")
+def cancel_job(job_id: str):
+    """Cancel a job that has not started yet"""
+    try:
+        cancelled = job_manager.cancel(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+    if not cancelled:
+        raise HTTPException(status_code=409, detail="Job is already running or finished")
+    return job_manager.status(job_id)
+
+def batch_tasks(request: BatchSolveRequest):
+    """
+    (original index, job_matrix, params) per instance, ordered by problem
+    size and formulation so that consecutive tasks on a worker reuse the
+    per-size constraint structures it already built.
+    """
+    shared = request.params or SolverParams()
+    tasks = []
+    for index, item in enumerate(request.instances):
+        params = shared
+        if item.params is not None:
+            # Re-validated, so the merged params get the same checks as any request
+            params = SolverParams.model_validate({**shared.model_dump(), **item.params.model_dump(exclude_unset=True)})
+        tasks.append((index, item.job_matrix, params))
+    tasks.sort(key=lambda t: (t[1].jobs, t[1].machines, t[2].solver_type, t[2].qubo_type))
+    return tasks
+
+@app.post("/api/solve_batch")
+def solve_batch_endpoint(request: BatchSolveRequest):
+    """
+    Solve many instances on the worker pool and stream one NDJSON line per
+    instance as it completes, followed by a summary line. The batch's
+    tasks count against the same pending-job limit as /api/jobs (429 when
+    it is already reached) and are submitted only as slots free up.
+    """
+    tasks = batch_tasks(request)
+    logger.info("Received batch of %d instances", len(tasks))
+    # Batch tasks share the pending-job limit with /api/jobs
+    try:
+        results = job_manager.map_unordered(solve, [(job_matrix, params) for _, job_matrix, params in tasks])
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    def stream():
+        start_time = time.time()
+        failed = 0
+        for position, result, error in results:
+            index = tasks[position][0]
+            line = {"index": index, "id": request.instances[index].id}
+            record_result(tasks[position][2], result, error)
+            if error is None:
+                line.update(status="done", result=result)
+            else:
+                failed += 1
+                line.update(status="failed", error=error)
+            yield json.dumps(line, default=json_default) + "\n"
+        summary = {"summary": {"instances": len(tasks), "failed": failed, "elapsed": time.time() - start_time}}
+        yield json.dumps(summary) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.post("/api/solve_stream")
+def solve_stream_endpoint(request: SolverRequest):
+    """
+    Solve with Server-Sent Events: "start" (with the stream id), "phase" when
+    a pipeline phase finishes (neh, local_search, sampler, ...), "incumbent"
+    for every improved sequence and a final "result" or "error".
+    The classical solver and the local sampler stop early on request; a
+    remote TitanQ call and multi-worker IG run to their time limit.
+    """
+    params = request.params or SolverParams()
+    logger.info("Streaming %dx%d instance with %s", request.job_matrix.jobs, request.job_matrix.machines,
+                solver_label(params))
+    events = solve_streams.run(solve, request.job_matrix, params,
+                               on_done=lambda result, error: record_result(params, result, error))
+    return StreamingResponse(events, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/api/solve_stream/{stream_id}/stop")
+def stop_solve_stream(stream_id: str):
+    """Ask a streaming solve to finish with its best solution so far"""
+    if not solve_streams.stop(stream_id):
+        raise HTTPException(status_code=404, detail=f"Unknown stream '{stream_id}'")
+    return {"stream_id": stream_id, "stopping": True}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Solve counters and per-phase histograms in the Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/qubo_cache")
+def qubo_cache_stats():
+    """Hit/miss counters and memory use of the QUBO cache (per process)"""
+    return qubo_cache.stats()
+
+@app.get("/api/formulations")
+def list_formulations(jobs: Optional[int] = None, machines: Optional[int] = None):
+    """
+    Registered solve paths with their required packages and load state;
+    with jobs and machines also their variable count and memory estimate.
+    """
+    return {
+        "formulations": [formulation.describe(jobs, machines) for formulation in formulations().values()],
+        "imports": import_report(),
+        "startup_time": STARTUP_IMPORT_TIME,
+    }
+
+@app.get("/api/result_cache")
+def result_cache_stats():
+    """Hit/coalescing counters and size of the solve result cache (per process)"""
+    return result_cache.stats()
+
+@app.on_event("startup")
+def report_startup():
+    # PRELOAD_FORMULATIONS ("all" or comma separated names) trades a slower
+    # start for a fast first request on those paths
+    names = os.environ.get("PRELOAD_FORMULATIONS", "")
+    if names:
+        preload(names)
+    packages = import_report()["packages"]
+    logger.info("API imported in %.2fs; heavy packages loaded: %s; not installed: %s", STARTUP_IMPORT_TIME,
+                ", ".join(name for name, info in packages.items() if info["loaded"]) or "none",
+                ", ".join(name for name, info in packages.items() if not info["installed"]) or "none")
+
+@app.on_event("shutdown")
+def shutdown_job_manager():
+    job_manager.shutdown()
+
+STARTUP_IMPORT_TIME = time.perf_counter() - _import_start
 
 # Update the command-line handling section at the end of the file
 if __name__ == "__main__":
     import sys
-    import json
     
     # Check if we're being called from the command line with JSON input
     if len(sys.argv) > 1:
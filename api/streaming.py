@@ -0,0 +1,94 @@
+import json
+import uuid
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from .payload import json_default
+
+__all__ = ['sse_event', 'SolveStreams']
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=json_default)}\n\n"
+
+class SolveStreams:
+    """
+    Runs solves on background threads and turns their progress events into
+    Server-Sent Events. Every stream gets an id (sent in the first "start"
+    event) that can be passed to `stop` to end the solve early; the solver
+    then returns its best solution so far as the final "result" event.
+    Disconnecting the client stops the solve as well.
+    """
+
+    def __init__(self, keepalive: float = 15.0):
+        self.keepalive = keepalive
+        self._stops: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def stop(self, stream_id: str) -> bool:
+        with self._lock:
+            stop = self._stops.get(stream_id)
+        if stop is None:
+            return False
+        stop.set()
+        return True
+
+    def active(self) -> int:
+        with self._lock:
+            return len(self._stops)
+
+    async def run(self, solve: Callable[..., Any], *args,
+                  on_done: Optional[Callable[[Any, Optional[BaseException]], None]] = None) -> AsyncIterator[str]:
+        """
+        Async generator of SSE messages for solve(*args, listener=..., stop=...):
+        "start", then "phase" / "incumbent" events as they happen, then a
+        final "result" or "error" event. The solve runs on its own thread;
+        being async, the generator is cancelled as soon as the client goes
+        away, which stops the solve.
+        """
+        stream_id = uuid.uuid4().hex
+        stop = threading.Event()
+        loop = asyncio.get_running_loop()
+        events: "asyncio.Queue" = asyncio.Queue()
+
+        def put(item):
+            loop.call_soon_threadsafe(events.put_nowait, item)
+
+        def listener(event: str, data: Dict[str, Any]):
+            put((event, data))
+
+        def worker():
+            try:
+                result = solve(*args, listener=listener, stop=stop)
+            except Exception as e:
+                put(("error", {"detail": str(getattr(e, "detail", e))}))
+                if on_done is not None:
+                    on_done(None, e)
+            else:
+                put(("result", result))
+                if on_done is not None:
+                    on_done(result, None)
+            finally:
+                put(None)
+
+        with self._lock:
+            self._stops[stream_id] = stop
+        threading.Thread(target=worker, name=f"solve-stream-{stream_id[:8]}", daemon=True).start()
+
+        try:
+            yield sse_event("start", {"stream_id": stream_id})
+            while True:
+                try:
+                    item = await asyncio.wait_for(events.get(), self.keepalive)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                if item is None:
+                    break
+                yield sse_event(*item)
+        finally:
+            # Client gone or stream finished: make sure the solver winds down
+            stop.set()
+            with self._lock:
+                self._stops.pop(stream_id, None)
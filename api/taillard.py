@@ -0,0 +1,126 @@
+import re
+import numpy as np
+from typing import Dict, List
+
+__all__ = ['FAMILIES', 'taillard_instance', 'taillard_family', 'instance_names', 'upper_bound']
+
+# Taillard, E. (1993). Benchmarks for basic scheduling problems.
+# European Journal of Operational Research, 64(2), 278-285.
+#
+# Instances are regenerated from the published time seeds with Taillard's
+# generator rather than stored. Upper bounds are the best known makespans.
+# ta001 ... ta120 are numbered family by family in the order below.
+
+FAMILIES = {
+    (20, 5): {
+        "seeds": [873654221, 379008056, 1866992158, 216771124, 495070989,
+                  402959317, 1369363414, 2021925980, 573109518, 88325120],
+        "upper_bounds": [1278, 1359, 1081, 1293, 1235, 1195, 1234, 1206, 1230, 1108],
+    },
+    (20, 10): {
+        "seeds": [587595453, 1401007982, 873136276, 268827376, 1634173168,
+                  691823909, 73807235, 1273398721, 2065119309, 1672900551],
+        "upper_bounds": [1582, 1659, 1496, 1377, 1419, 1397, 1484, 1538, 1593, 1591],
+    },
+    (20, 20): {
+        "seeds": [479340445, 268827376, 1958948863, 918272953, 555010963,
+                  2010851491, 1519833303, 1748670931, 1923497586, 1829909967],
+        "upper_bounds": [2297, 2099, 2326, 2223, 2291, 2226, 2273, 2200, 2237, 2178],
+    },
+    (50, 5): {
+        "seeds": [1328042058, 200382020, 496319842, 1203030903, 1730708564,
+                  450926852, 1303135678, 1273398721, 587288402, 248421594],
+        "upper_bounds": [2724, 2834, 2621, 2751, 2863, 2829, 2725, 2683, 2552, 2782],
+    },
+    (50, 10): {
+        "seeds": [1958948863, 575633267, 655816003, 1977864101, 93805469,
+                  1803345551, 49612559, 1899802599, 2013025619, 578962478],
+        "upper_bounds": [2991, 2867, 2839, 3063, 2976, 3006, 3093, 3037, 2897, 3065],
+    },
+    (50, 20): {
+        "seeds": [1539989115, 691823909, 655816003, 1315102446, 1949668355,
+                  1923497586, 1805594913, 1861070898, 715643788, 464843328],
+        "upper_bounds": [3850, 3704, 3640, 3723, 3611, 3681, 3704, 3691, 3743, 3756],
+    },
+    (100, 5): {
+        "seeds": [896678084, 1179439976, 1122278347, 416756875, 267829958,
+                  1835213917, 1328833962, 1418570761, 161033112, 304212574],
+        "upper_bounds": [5493, 5268, 5175, 5014, 5250, 5135, 5246, 5094, 5448, 5322],
+    },
+    (100, 10): {
+        "seeds": [1539989115, 655816003, 960914243, 1915696806, 2013025619,
+                  1168140026, 1923497586, 167698528, 1528387973, 993794175],
+        "upper_bounds": [5770, 5349, 5676, 5781, 5467, 5303, 5595, 5617, 5871, 5845],
+    },
+    (100, 20): {
+        "seeds": [450926852, 1462772409, 1021685265, 83696007, 508154254,
+                  1861070898, 26482542, 444956424, 2115448041, 118254244],
+        "upper_bounds": [6202, 6183, 6271, 6269, 6314, 6364, 6268, 6401, 6275, 6434],
+    },
+    (200, 10): {
+        "seeds": [471503978, 1215892992, 135346136, 1602504050, 160037322,
+                  551454346, 519485142, 383947510, 1968171878, 540872513],
+        "upper_bounds": [10862, 10480, 10922, 10889, 10524, 10329, 10854, 10730, 10438, 10675],
+    },
+    (200, 20): {
+        "seeds": [2013025619, 475051709, 914834335, 810642687, 1019331795,
+                  2056065863, 1342855162, 1325809384, 1988803007, 765656702],
+        "upper_bounds": [11195, 11203, 11281, 11275, 11259, 11176, 11360, 11334, 11192, 11288],
+    },
+    (500, 20): {
+        "seeds": [1368624604, 450181436, 1927888393, 1759567256, 606425239,
+                  19268348, 1298201670, 2041736264, 379756761, 28837162],
+        "upper_bounds": [26040, 26520, 26371, 26456, 26334, 26477, 26389, 26560, 26005, 26457],
+    },
+}
+
+_NAMES: Dict[str, tuple] = {}
+for _f, _size in enumerate(FAMILIES):
+    for _k in range(10):
+        _NAMES[f"ta{10 * _f + _k + 1:03d}"] = (_size, _k)
+
+def _generate(seed: int, n: int, m: int) -> np.ndarray:
+    """
+    Taillard's generator: a Lehmer LCG (a = 16807, modulus 2^31 - 1, Schrage
+    decomposition) drawing U[1, 99] for each machine, then each job.
+    Returns the (n, m) processing times, jobs as rows.
+    """
+    a, b, c, modulus = 16807, 127773, 2836, 2**31 - 1
+    p = np.empty((m, n), dtype=np.int64)
+    for i in range(m):
+        for j in range(n):
+            k = seed // b
+            seed = a * (seed % b) - k * c
+            if seed < 0:
+                seed += modulus
+            p[i, j] = 1 + int(seed / modulus * 99)
+    return p.T
+
+def instance_names() -> List[str]:
+    return list(_NAMES)
+
+def _lookup(name: str):
+    if name not in _NAMES:
+        raise KeyError(f"Unknown Taillard instance '{name}', expected ta001 ... ta120")
+    return _NAMES[name]
+
+def taillard_instance(name: str) -> np.ndarray:
+    """
+    Processing times of a Taillard instance ("ta001" ... "ta120"), (n, m).
+    """
+    (n, m), k = _lookup(name)
+    return _generate(FAMILIES[(n, m)]["seeds"][k], n, m)
+
+def upper_bound(name: str) -> int:
+    (n, m), k = _lookup(name)
+    return FAMILIES[(n, m)]["upper_bounds"][k]
+
+def taillard_family(family: str) -> List[str]:
+    """
+    Instance names of a family given as "20x5", "50x10", ...
+    """
+    match = re.fullmatch(r"(\d+)x(\d+)", family)
+    if not match or (int(match.group(1)), int(match.group(2))) not in FAMILIES:
+        raise KeyError(f"Unknown Taillard family '{family}'")
+    size = (int(match.group(1)), int(match.group(2)))
+    return [name for name, (s, _) in _NAMES.items() if s == size]